@@ -0,0 +1,57 @@
+"""Measure the throughput of `insert_or_replace` under each SQLite profile in `database.profiles`
+
+Usage: `python -m benchmarks.database_profiles [--rows 2000]`
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.models import Base, User
+from database.profiles import SQLITE_PROFILES, apply_sqlite_profile
+
+
+async def benchmark(profile: str, rows: int, directory: Path) -> tuple[float, float]:
+    """Return (rows per second of single-row commits, rows per second of one-transaction commits)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory / f'{profile}.db'}")
+    apply_sqlite_profile(engine, profile)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Same as Database.insert_or_replace: one session and one commit per row
+    start_time = time.perf_counter()
+    for i in range(rows):
+        async with sessionmaker() as session:
+            await session.merge(User(discord_id=i, cookie_default=f"cookie_{i}"))
+            await session.commit()
+    single = rows / (time.perf_counter() - start_time)
+
+    # Same as Database.insert_or_replace_all: all rows in one transaction
+    start_time = time.perf_counter()
+    async with sessionmaker() as session:
+        for i in range(rows):
+            await session.merge(User(discord_id=i, uid_genshin=i))
+        await session.commit()
+    batch = rows / (time.perf_counter() - start_time)
+
+    await engine.dispose()
+    return single, batch
+
+
+async def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        print(f"{'profile':<10} {'single commit (rows/s)':>24} {'one transaction (rows/s)':>26}")
+        for profile in SQLITE_PROFILES:
+            single, batch = await benchmark(profile, rows, Path(directory))
+            print(f"{profile:<10} {single:>24.0f} {batch:>26.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000, help="Number of rows written in each test")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
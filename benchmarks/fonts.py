@@ -0,0 +1,71 @@
+"""Measure the font loading cost of one card before and after the font registry (`utility.fonts`)
+
+The calls below are the (font, size) requests made when rendering one Enka showcase card
+and one exploration card. "before" loads the font file on every request like the painters used to,
+"after" goes through `load_font`, which only loads each (font, size) once per process.
+
+Usage: `python -m benchmarks.fonts [--cards 20]`
+"""
+import argparse
+import time
+
+from PIL import ImageFont
+
+from enka_network.utils import FONTS
+from utility.fonts import load_font
+
+ENKA_CARD_CALLS: list[tuple[str, int]] = [
+    (FONTS["normal"], size)
+    for size, count in {12: 4, 14: 1, 16: 1, 17: 6, 18: 5, 20: 6, 22: 13, 23: 4, 27: 1, 30: 2}.items()
+    for _ in range(count)
+]
+"""Font requests of one Enka card (the enka_card.get_font calls, without the per-artifact repeats)"""
+
+EXPLORATION_CARD_CALLS: list[tuple[str, int]] = [
+    ("data/font/SourceHanSerifTC-Bold.otf", 88),
+    ("data/font/SourceHanSansTC-Medium.otf", 40),
+] + [
+    call
+    for size in [41] * 8 + [35] * 8
+    for call in [
+        ("data/font/SourceHanSansTC-Bold.otf", 30),
+        ("data/font/SourceHanSansTC-Bold.otf", 80),
+        ("data/font/SourceHanSansTC-Regular.otf", size),
+    ]
+]
+"""Font requests of one exploration card (draw_text calls)"""
+
+
+def measure(calls: list[tuple[str, int]], cards: int) -> tuple[float, float]:
+    """Return the average font cost per card in milliseconds (before, after)"""
+    start_time = time.perf_counter()
+    for _ in range(cards):
+        for path, size in calls:
+            ImageFont.truetype(path, size)
+    before = (time.perf_counter() - start_time) / cards * 1000
+
+    load_font.cache_clear()
+    start_time = time.perf_counter()
+    for _ in range(cards):
+        for path, size in calls:
+            load_font(path, size)
+    after = (time.perf_counter() - start_time) / cards * 1000
+    return before, after
+
+
+def main(cards: int) -> None:
+    print(f"{'card':<12} {'font requests':>14} {'before (ms/card)':>17} {'after (ms/card)':>16}")
+    for name, calls in [("enka", ENKA_CARD_CALLS), ("exploration", EXPLORATION_CARD_CALLS)]:
+        try:
+            before, after = measure(calls, cards)
+        except OSError as e:
+            print(f"{name:<12} skipped, font not found: {e}")
+            continue
+        print(f"{name:<12} {len(calls):>14} {before:>17.2f} {after:>16.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=20, help="Number of cards to simulate")
+    args = parser.parse_args()
+    main(args.cards)
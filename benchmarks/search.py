@@ -0,0 +1,59 @@
+"""Measure the autocomplete latency of /search-data before and after the search index (`genshin_db.search`)
+
+"before" is the linear scan the autocomplete used to run on every keystroke,
+"after" is `SearchIndex.search` on the prebuilt index of each category.
+The data is loaded from the genshin-db snapshot, or fetched from the API when there is no snapshot.
+
+Usage: `python -m benchmarks.search [--rounds 200]`
+"""
+import argparse
+import asyncio
+import time
+
+from cogs.data_search.cog import build_search_indexes
+from genshin_db import GenshinDb, SearchIndex
+from utility import HttpSession
+
+QUERIES: list[str] = ["a", "sk", "amos", "jade", "the", "wolfs grav", "mistspliter", "xaingling", "zzzz"]
+
+
+def measure(index: SearchIndex, query: str, rounds: int) -> tuple[float, float]:
+    """Return the average latency of one query in microseconds (before, after)"""
+    names = index.names
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        choices = [name for name in names if query.lower() in name.lower()][:25]
+        choices.sort()
+    before = (time.perf_counter() - start_time) / rounds * 1_000_000
+
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        index.search(query, limit=25)
+    after = (time.perf_counter() - start_time) / rounds * 1_000_000
+    return before, after
+
+
+async def main(rounds: int) -> None:
+    if not await GenshinDb.load():
+        await GenshinDb.refresh()
+        await HttpSession.close()
+    if GenshinDb.data is None:
+        print("No genshin-db data")
+        return
+
+    start_time = time.perf_counter()
+    indexes = build_search_indexes(GenshinDb.data)
+    print(f"Built the indexes in {(time.perf_counter() - start_time) * 1000:.1f} ms\n")
+
+    print(f"{'category':<12} {'names':>6} {'query':<12} {'before (us)':>12} {'after (us)':>11}")
+    for category, index in indexes.items():
+        for query in QUERIES:
+            before, after = measure(index, query, rounds)
+            print(f"{category:<12} {len(index):>6} {query:<12} {before:>12.1f} {after:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200, help="Number of times each query is run")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
@@ -4,7 +4,7 @@ import typing
 import discord
 
 import genshin_py
-from database import Database, StarrailForgottenHall, StarrailPureFiction, User
+from database import Database, StarrailForgottenHall, StarrailPureFiction
 from utility import EmbedTemplate, config
 
 
@@ -197,7 +197,7 @@ class ForgottenHallUI:
             return
 
         nickname = userstats.info.nickname
-        _u = await Database.select_one(User, User.discord_id == user.id)
+        _u = await Database.select_user(user.id)
         uid = _u.uid_starrail if _u else 0
         uid = uid or 0
 
@@ -4,11 +4,12 @@ import typing
 from datetime import datetime, time, timedelta
 
 import discord
-import enkanetwork
 from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands, tasks
 
+import genshin_db
+from enka_network.prefetch import prefetch_assets, update_enka_assets
 from genshin_py import auto_task
 from utility import SlashCommandLogger, config, get_app_command_mention
 
@@ -74,11 +75,19 @@ class Admin(commands.Cog):
                 await interaction.edit_original_response(content="Start executing the daily auto check-in")
                 asyncio.create_task(auto_task.DailyReward.execute(self.bot))
             case "UPDATE_ENKA_ASSETS":  # Update Enka assets for a new version
-                client = enkanetwork.EnkaNetworkAPI()
-                async with client:
-                    await client.update_assets()
-                enkanetwork.Assets(lang=enkanetwork.Language.EN)
-                await interaction.edit_original_response(content="Enka data update completed")
+                await update_enka_assets()
+                await interaction.edit_original_response(content="Enka data update completed, downloading assets...")
+
+                async def report_progress(finished: int, total: int) -> None:
+                    await interaction.edit_original_response(
+                        content=f"Enka data update completed, downloading assets ({finished}/{total})"
+                    )
+
+                downloaded, failed = await prefetch_assets(report_progress)
+                await interaction.edit_original_response(
+                    content=f"Enka data update completed, {downloaded} assets downloaded"
+                    + (f", {failed} assets failed" if failed > 0 else "")
+                )
 
     # /config command: Set config file parameters
     @app_commands.command(name="config", description="Change config file content")
@@ -90,7 +99,7 @@ class Admin(commands.Cog):
                 name="schedule_check_resin_interval",
                 value="schedule_check_resin_interval",
             ),
-            Choice(name="schedule_loop_delay", value="schedule_loop_delay"),
+            Choice(name="schedule_notes_concurrency", value="schedule_notes_concurrency"),
         ]
     )
     @SlashCommandLogger
@@ -98,10 +107,9 @@ class Admin(commands.Cog):
         if option in [
             "schedule_daily_reward_time",
             "schedule_check_resin_interval",
+            "schedule_notes_concurrency",
         ]:
             setattr(config, option, int(value))
-        elif option in ["schedule_loop_delay"]:
-            setattr(config, option, float(value))
         await interaction.response.send_message(f"{option} value has been set to: {value}")
 
     # /maintenance command: Set game maintenance time
@@ -150,7 +158,7 @@ class Admin(commands.Cog):
     # Refresh genshin_db API data every day at a specific time
     @tasks.loop(time=time(hour=20, minute=00))
     async def refresh_genshin_db(self):
-        await self.bot.reload_extension("cogs.data_search.cog")
+        await genshin_db.GenshinDb.refresh()
 
     @refresh_genshin_db.before_loop
     async def before_refresh_genshin_db(self):
@@ -1,24 +1,56 @@
 import random
+import time
 from typing import Iterable, List, Literal
 
 import discord
-import sentry_sdk
 from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands
 
 import genshin_db
 from utility import EmbedTemplate, config, custom_log
+from utility.prometheus import Metrics
 
 from .ui import SearchResultsDropdown
 
 StrCategory = Literal["Character", "Weapon", "Artifact", "Item/Food", "Achievements", "TCG-cards"]
 
 
+def build_search_indexes(db: genshin_db.GenshinDbAllData) -> dict[str, genshin_db.SearchIndex]:
+    """Build the autocomplete index of each category"""
+    item_lists: dict[str, Iterable[genshin_db.GenshinDbBase]] = {
+        "Character": db.characters.list,
+        "Weapon": db.weapons.list,
+        "Artifact": db.artifacts.list,
+        "Item/Food": db.materials.list + db.foods.list,
+        "Achievement": db.achievements.list,
+        "TCG-cards": db.tcg_cards.list,
+    }
+    return {
+        category: genshin_db.SearchIndex(item.name for item in items) for category, items in item_lists.items()
+    }
+
+
 class Search(commands.Cog, name="search-data"):
-    def __init__(self, bot: commands.Bot, genshin_db_data: genshin_db.GenshinDbAllData):
+    def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = genshin_db_data
+        self._indexed_data: genshin_db.GenshinDbAllData | None = None
+        self._indexes: dict[str, genshin_db.SearchIndex] = {}
+
+    @property
+    def db(self) -> genshin_db.GenshinDbAllData | None:
+        """Current genshin-db data, replaced as a whole when the data is refreshed"""
+        return genshin_db.GenshinDb.data
+
+    def get_search_indexes(self) -> dict[str, genshin_db.SearchIndex]:
+        """Autocomplete indexes of the current data, rebuilt when the data is replaced"""
+        db = self.db
+        if db is None:
+            return {}
+        if db is not self._indexed_data:
+            self._indexes = build_search_indexes(db)
+            self._indexed_data = db
+        return self._indexes
 
     @app_commands.command(name="search-data", description="Search the Genshin Impact database")
     @app_commands.rename(category="category", item_name="name")
@@ -41,33 +73,39 @@ class Search(commands.Cog, name="search-data"):
         item_name: str,
     ):
         """Search genshin-db database with a slash command"""
+        db = self.db
+        if db is None:
+            _embed = EmbedTemplate.error("The database is still loading, please try again later")
+            await interaction.response.send_message(embed=_embed)
+            return
+
         titles: list[str] = []
         embeds: list[discord.Embed] = []
         match category:
             case "Character":
-                character = self.db.characters.find(item_name)
+                character = db.characters.find(item_name)
                 titles.append("Basic Information")
                 embeds.append(genshin_db.parse(character))
 
                 # Special handling for Traveler with multiple elements
                 if "Traveler" in item_name:
                     for element in ["Anemo", "Geo", "Electro", "Dendro", "Hydro"]:
-                        talent = self.db.talents.find(f"Traveler ({element})")
+                        talent = db.talents.find(f"Traveler ({element})")
                         titles.append(f"Talent: {element}")
                         embeds.append(genshin_db.parse(talent))
                     for element in ["Anemo", "Geo", "Electro", "Dendro", "Hydro"]:
-                        constell = self.db.constellations.find(f"Traveler ({element})")
+                        constell = db.constellations.find(f"Traveler ({element})")
                         titles.append(f"Constellation: {element}")
                         embeds.append(genshin_db.parse(constell))
                 else:
-                    talent = self.db.talents.find(item_name)
+                    talent = db.talents.find(item_name)
                     titles.append("Talent")
                     embeds.append(genshin_db.parse(talent))
-                    constell = self.db.constellations.find(item_name)
+                    constell = db.constellations.find(item_name)
                     titles.append("Constellation")
                     embeds.append(genshin_db.parse(constell))
             case "Artifact":
-                artifact = self.db.artifacts.find(item_name)
+                artifact = db.artifacts.find(item_name)
                 if artifact is None:
                     return
                 titles = ["Overview"]
@@ -85,7 +123,7 @@ class Search(commands.Cog, name="search-data"):
                         titles.append(_titles[i])
                         embeds.append(genshin_db.parse(_part))
             case _:
-                item = self.db.find(item_name)
+                item = db.find(item_name)
                 embeds.append(genshin_db.parse(item))
 
         match len(embeds):
@@ -106,36 +144,23 @@ class Search(commands.Cog, name="search-data"):
         """Autocomplete for the item_name parameter of the slash_search command"""
 
         category: StrCategory | None = interaction.namespace.category
-        if category is None:
+        if category is None or (index := self.get_search_indexes().get(category)) is None:
             return []
 
-        item_list: Iterable[genshin_db.GenshinDbBase] = {
-            "Character": self.db.characters.list,
-            "Weapon": self.db.weapons.list,
-            "Artifact": self.db.artifacts.list,
-            "Item/Food": self.db.materials.list + self.db.foods.list,
-            "Achievement": self.db.achievements.list,
-            "TCG-cards": self.db.tcg_cards.list,
-        }.get(category, [])
-
-        choices: List[Choice[str]] = []
-        for item in item_list:
-            if current.lower() in item.name.lower():
-                choices.append(Choice(name=item.name, value=item.name))
         # Randomly select 25 if the user didn't input anything
         if current == "":
-            choices = random.sample(choices, k=25)
-
-        choices = choices[:25]
-        choices.sort(key=lambda choice: choice.name)
-        return choices
+            names = random.sample(index.names, k=min(25, len(index)))
+            names.sort()
+        else:
+            start_time = time.perf_counter()
+            names = index.search(current, limit=25)
+            Metrics.SEARCH_AUTOCOMPLETE_SECONDS.labels(category).observe(time.perf_counter() - start_time)
+        return [Choice(name=name, value=name) for name in names]
 
 
 async def setup(client: commands.Bot):
-    try:
-        gdb_data = await genshin_db.fetch_all()
-    except Exception as e:
-        custom_log.LOG.Error(str(e))
-        sentry_sdk.capture_exception(e)
-    else:
-        await client.add_cog(Search(client, gdb_data))
+    # Serve the search from the snapshot on disk, the latest data is fetched after the bot is ready (main.py)
+    await genshin_db.GenshinDb.load()
+    cog = Search(client)
+    cog.get_search_indexes()
+    await client.add_cog(cog)
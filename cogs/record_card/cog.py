@@ -8,7 +8,7 @@ from discord.app_commands import Choice
 from discord.ext import commands
 
 import genshin_py
-from utility import EmbedTemplate, config
+from utility import EmbedTemplate, RenderService, config
 from utility.custom_log import LOG, ContextCommandLogger, SlashCommandLogger
 
 
@@ -30,9 +30,9 @@ class RecordCard:
         try:
             avatar_bytes = await user.display_avatar.read()
             if option == "RECORD":
-                fp = genshin_py.draw_record_card(avatar_bytes, uid, userstats)
+                fp = await RenderService.render(genshin_py.draw_record_card, avatar_bytes, uid, userstats)
             elif option == "EXPLORATION":
-                fp = genshin_py.draw_exploration_card(avatar_bytes, uid, userstats)
+                fp = await RenderService.render(genshin_py.draw_exploration_card, avatar_bytes, uid, userstats)
         except Exception as e:
             LOG.ErrorLog(interaction, e)
             sentry_sdk.capture_exception(e)
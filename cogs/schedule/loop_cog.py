@@ -1,6 +1,5 @@
 import asyncio
-import shutil
-from datetime import date, datetime
+from datetime import datetime
 
 import sentry_sdk
 from discord.ext import commands, tasks
@@ -18,12 +17,14 @@ class ScheduleLoopCog(commands.Cog, name="schedule"):
 
     async def cog_unload(self) -> None:
         self.schedule.cancel()
+        await database.LastUsedTracker.flush()
 
     loop_interval = 1
 
     @tasks.loop(minutes=loop_interval)
     async def schedule(self):
         now = datetime.now()
+        asyncio.create_task(self.flush_last_used_time())
         if config.game_maintenance_time is None or not (
             config.game_maintenance_time[0] <= now < config.game_maintenance_time[1]
         ):
@@ -34,15 +35,29 @@ class ScheduleLoopCog(commands.Cog, name="schedule"):
                 asyncio.create_task(auto_task.RealtimeNotes.execute(self.bot))
 
         if now.hour == 1 and now.minute < self.loop_interval:
-            try:
-                db_path = "data/bot/bot.db"
-                today = date.today()
-                shutil.copyfile(db_path, f"{db_path.split('.')[0]}_backup_{today}.db")
-            except Exception as e:
-                LOG.Error(str(e))
-                sentry_sdk.capture_exception(e)
+            asyncio.create_task(self.backup_database())
             asyncio.create_task(database.Tool.remove_expired_user(config.expired_user_days))
 
+    async def backup_database(self):
+        try:
+            path = await database.Backup.run(
+                pages=config.database_backup_pages,
+                compress=config.database_backup_compress,
+                keep=config.database_backup_keep,
+            )
+        except Exception as e:
+            LOG.Error(str(e))
+            sentry_sdk.capture_exception(e)
+        else:
+            LOG.System(f"Database backup completed: {path}")
+
+    async def flush_last_used_time(self):
+        try:
+            await database.LastUsedTracker.flush()
+        except Exception as e:
+            LOG.Error(f"Failed to write the last used time of users: {e}")
+            sentry_sdk.capture_exception(e)
+
     @schedule.before_loop
     async def before_schedule(self):
         await self.bot.wait_until_ready()
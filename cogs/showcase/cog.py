@@ -40,10 +40,7 @@ class ShowcaseCog(commands.Cog, name="showcase-characters"):
 
 
 async def setup(client: commands.Bot):
-    # Update Enka material data
-    enka = enkanetwork.EnkaNetworkAPI()
-    async with enka:
-        await enka.update_assets()
+    # Load the local Enka data, the latest data is downloaded after the bot is ready (main.py)
     enkanetwork.Assets(lang=enkanetwork.Language.EN)
 
     await client.add_cog(ShowcaseCog(client))
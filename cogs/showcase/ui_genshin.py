@@ -5,7 +5,7 @@ import discord
 import enkanetwork
 import sentry_sdk
 
-from database import Database, GenshinShowcase, User
+from database import Database, GenshinShowcase
 from enka_network import Showcase, enka_assets
 from utility import EmbedTemplate, config, emoji, get_app_command_mention
 from utility.custom_log import LOG
@@ -54,7 +54,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
             )
         elif index == -2:  # Delete Cache Data
             # Check if the interaction user's UID matches the showcase UID
-            user = await Database.select_one(User, User.discord_id.is_(interaction.user.id))
+            user = await Database.select_user(interaction.user.id)
             if user is None or user.uid_genshin != self.showcase.uid:
                 await interaction.response.send_message(
                     embed=EmbedTemplate.error("Not the owner of this UID, cannot delete data"), ephemeral=True
@@ -70,6 +70,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
                     GenshinShowcase,
                     GenshinShowcase.uid.is_(self.showcase.uid),
                 )
+                Showcase.invalidate(self.showcase.uid)
                 await interaction.response.edit_message(embed=embed, view=None, attachments=[])
 
 
@@ -121,6 +122,7 @@ class ShowcaseView(discord.ui.View):
 
     def __init__(self, showcase: Showcase, character_index: Optional[int] = None):
         super().__init__(timeout=config.discord_view_long_timeout)
+        self.showcase = showcase
         if character_index is not None:
             self.add_item(GenerateImageButton(showcase, character_index))
             self.add_item(ShowcaseButton("Character Stats", showcase.get_character_stat_embed, character_index))
@@ -129,6 +131,9 @@ class ShowcaseView(discord.ui.View):
         if showcase.data.player.characters_preview:  # type: ignore
             self.add_item(ShowcaseCharactersDropdown(showcase))
 
+    async def on_timeout(self) -> None:
+        self.showcase.cancel_prerender()
+
 
 async def showcase(
     interaction: discord.Interaction,
@@ -136,7 +141,7 @@ async def showcase(
     uid: Optional[int] = None,
 ):
     await interaction.response.defer()
-    _user = await Database.select_one(User, User.discord_id.is_(user.id))
+    _user = await Database.select_user(user.id)
     uid = uid or (_user.uid_genshin if _user else None)
     if uid is None:
         await interaction.edit_original_response(
@@ -154,6 +159,7 @@ async def showcase(
             view = ShowcaseView(showcase)
             embed = showcase.get_player_overview_embed()
             await interaction.edit_original_response(embed=embed, view=view)
+            showcase.start_prerender()
         except Exception as e:
             LOG.ErrorLog(interaction, e)
             sentry_sdk.capture_exception(e)
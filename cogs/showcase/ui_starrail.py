@@ -3,7 +3,7 @@ from typing import Any
 import discord
 import sentry_sdk
 
-from database import Database, StarrailShowcase, User
+from database import Database, StarrailShowcase
 from star_rail.showcase import Showcase
 from utility import EmbedTemplate, config, emoji, get_app_command_mention
 from utility.custom_log import LOG
@@ -45,7 +45,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
             )
         elif index == -2:  # Delete Cache Data
             # Check if the interaction user's UID matches the showcase UID
-            user = await Database.select_one(User, User.discord_id.is_(interaction.user.id))
+            user = await Database.select_user(interaction.user.id)
             if user is None or user.uid_starrail != self.showcase.uid:
                 await interaction.response.send_message(
                     embed=EmbedTemplate.error("Not the owner of this UID, cannot delete data"), ephemeral=True
@@ -61,6 +61,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
                     StarrailShowcase,
                     StarrailShowcase.uid.is_(self.showcase.uid),
                 )
+                Showcase.invalidate(self.showcase.uid)
                 await interaction.response.edit_message(embed=embed, view=None, attachments=[])
 
 
@@ -118,7 +119,7 @@ async def showcase(
     uid: int | None = None,
 ):
     await interaction.response.defer()
-    _u = await Database.select_one(User, User.discord_id.is_(user.id))
+    _u = await Database.select_user(user.id)
     uid = uid or (_u.uid_starrail if _u else None)
     if uid is None:
         await interaction.edit_original_response(
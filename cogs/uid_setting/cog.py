@@ -7,7 +7,7 @@ from discord.app_commands import Choice
 from discord.ext import commands
 
 import genshin_py
-from database import Database, User
+from database import Database
 from utility import EmbedTemplate, config, custom_log
 
 from .ui import UidDropdown, UIDModal
@@ -32,7 +32,7 @@ class UIDSettingCog(commands.Cog, name="UID Settings"):
         interaction: discord.Interaction,
         game: genshin.Game,
     ):
-        user = await Database.select_one(User, User.discord_id.is_(interaction.user.id))
+        user = await Database.select_user(interaction.user.id)
         cookie = None
         if user is not None:
             match game:
@@ -4,6 +4,7 @@ import discord
 import genshin
 
 from database import Database, User
+from genshin_py import ClientPool
 from utility import EmbedTemplate, get_server_name
 
 
@@ -22,7 +23,7 @@ class UIDModal(discord.ui.Modal, title="Submit UID"):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        user = await Database.select_one(User, User.discord_id.is_(interaction.user.id))
+        user = await Database.select_user(interaction.user.id)
         if user is None:
             user = User(interaction.user.id)
 
@@ -35,6 +36,7 @@ class UIDModal(discord.ui.Modal, title="Submit UID"):
                 user.uid_starrail = int(self.uid.value)
         try:
             await Database.insert_or_replace(user)
+            ClientPool.invalidate(interaction.user.id)
         except Exception as e:
             await interaction.response.send_message(embed=EmbedTemplate.error(e), ephemeral=True)
         else:
@@ -62,7 +64,7 @@ class UidDropdown(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         uid = self.accounts[int(self.values[0])].uid
-        user = await Database.select_one(User, User.discord_id.is_(interaction.user.id))
+        user = await Database.select_user(interaction.user.id)
         if user is None:
             raise ValueError("User not found")
         match self.game:
@@ -71,6 +73,7 @@ class UidDropdown(discord.ui.Select):
             case genshin.Game.STARRAIL:
                 user.uid_starrail = uid
         await Database.insert_or_replace(user)
+        ClientPool.invalidate(interaction.user.id)
         await interaction.response.edit_message(
             embed=EmbedTemplate.normal(f"Character UID: {uid} has been successfully set"), view=None
         )
@@ -1,5 +1,8 @@
 from .app import Database
+from .backup import Backup
+from .batch_writer import BatchWriter
 from .dataclass import *
+from .last_used import LastUsedTracker
 from .migration import migrate
 from .models import (
     Base,
@@ -1,12 +1,18 @@
+import asyncio
 import pathlib
-from typing import Sequence, TypeVar
+from typing import Any, Sequence, TypeVar
 
 import sqlalchemy
 from alembic import command as alembic_cmd
 from alembic.config import Config as alembic_config
+from cachetools import LRUCache
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy.sql._typing import ColumnExpressionArgument
 
+from utility.config import config
+from utility.prometheus import Metrics
+
 from .models import (
     Base,
     GenshinScheduleNotes,
@@ -16,13 +22,16 @@ from .models import (
     StarrailShowcase,
     User,
 )
+from .profiles import apply_sqlite_profile
 
 DatabaseModel = Base
 T_DatabaseModel = TypeVar("T_DatabaseModel", bound=Base)
 
 
 _engine = create_async_engine("sqlite+aiosqlite:///data/bot/bot.db")
+apply_sqlite_profile(_engine, config.database_profile)
 _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+_user_columns = [attr.key for attr in sqlalchemy.inspect(User).column_attrs]
 
 
 class Database:
@@ -31,18 +40,24 @@ class Database:
     engine = _engine
     sessionmaker = _sessionmaker
 
+    _user_cache: LRUCache[int, dict[str, Any] | None] = LRUCache(maxsize=config.user_cache_size)
+    """Column values of the recently used users, `None` means the user does not exist"""
+    _user_cache_version: int = 0
+    """Incremented on every write of the users table, used to avoid caching rows read before a write"""
+
     @classmethod
     async def init(cls) -> None:
         """Initialize the database; call this once when the bot starts."""
         alembic_cfg = alembic_config("database/alembic/alembic.ini")
+        # Alembic is synchronous, run it in a thread so it does not block the other startup stages
         if pathlib.Path("data/bot/bot.db").exists():
             # If the database file exists, run the Alembic upgrade command
-            alembic_cmd.upgrade(alembic_cfg, "head")
+            await asyncio.to_thread(alembic_cmd.upgrade, alembic_cfg, "head")
         else:
             # If the database file doesn't exist, create all tables and set the version to "head"
             async with cls.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
-            alembic_cmd.stamp(alembic_cfg, "head")
+            await asyncio.to_thread(alembic_cmd.stamp, alembic_cfg, "head")
 
     @classmethod
     async def close(cls) -> None:
@@ -62,6 +77,28 @@ class Database:
         async with cls.sessionmaker() as session:
             await session.merge(instance)
             await session.commit()
+        if isinstance(instance, User):
+            cls._cache_user(instance)
+
+    @classmethod
+    async def insert_or_replace_all(cls, instances: Sequence[DatabaseModel]) -> None:
+        """Insert multiple objects into the database within a single transaction, replacing old objects with the same Primary Key.
+        Example: `Database.insert_or_replace_all([User(discord_id=123), User(discord_id=456)])`
+
+        Parameters:
+        ------
+        instances: `Sequence[DatabaseModel]`
+            Instance objects of the database table (ORM).
+        """
+        if len(instances) == 0:
+            return
+        async with cls.sessionmaker() as session:
+            for instance in instances:
+                await session.merge(instance)
+            await session.commit()
+        for instance in instances:
+            if isinstance(instance, User):
+                cls._cache_user(instance)
 
     @classmethod
     async def select_one(
@@ -91,6 +128,40 @@ class Database:
             result = await session.execute(stmt)
             return result.scalar()
 
+    @classmethod
+    async def select_user(cls, discord_id: int) -> User | None:
+        """Select the user with the specified Discord ID, the result is cached in memory so that frequent calls
+        do not read the database. Use this instead of `select_one(User, ...)`.
+        Example: `Database.select_user(123456)`
+
+        Parameters:
+        ------
+        discord_id: `int`
+            User's Discord ID.
+
+        Returns:
+        ------
+        `User` | `None`:
+            A new `User` object each call that can be modified freely, or `None` if the user does not exist.
+        """
+        if discord_id in cls._user_cache:
+            Metrics.USER_CACHE_REQUESTS.labels("hit").inc()
+            values = cls._user_cache[discord_id]
+            if values is None:
+                return None
+            user = User(**values)
+            make_transient_to_detached(user)
+            return user
+
+        Metrics.USER_CACHE_REQUESTS.labels("miss").inc()
+        version = cls._user_cache_version
+        user = await cls.select_one(User, User.discord_id.is_(discord_id))
+        if version == cls._user_cache_version:
+            cls._user_cache[discord_id] = (
+                {key: getattr(user, key) for key in _user_columns} if user is not None else None
+            )
+        return user
+
     @classmethod
     async def select_all(
         cls,
@@ -131,6 +202,8 @@ class Database:
         async with cls.sessionmaker() as session:
             await session.delete(instance)
             await session.commit()
+        if isinstance(instance, User):
+            cls.invalidate_user(instance.discord_id)
 
     @classmethod
     async def delete(
@@ -159,7 +232,7 @@ class Database:
         discord_id: `int`
             User's Discord ID.
         """
-        user = await cls.select_one(User, User.discord_id.is_(discord_id))
+        user = await cls.select_user(discord_id)
         if user is None:
             return
         await cls.delete(User, User.discord_id.is_(discord_id))
@@ -169,3 +242,38 @@ class Database:
         await cls.delete(GenshinShowcase, GenshinShowcase.uid.is_(user.uid_genshin))
         await cls.delete(StarrailShowcase, StarrailShowcase.uid.is_(user.uid_starrail))
         await cls.delete(User, User.discord_id.is_(discord_id))
+
+    @classmethod
+    def invalidate_user(cls, discord_id: int) -> None:
+        """Remove the user from the in-memory cache, call this after the users table is modified without
+        going through the `Database` methods.
+
+        Parameters:
+        ------
+        discord_id: `int`
+            User's Discord ID.
+        """
+        cls._user_cache_version += 1
+        cls._user_cache.pop(discord_id, None)
+
+    @classmethod
+    def update_cached_user(cls, discord_id: int, **values: Any) -> None:
+        """Update the column values of the cached user after the users table is updated with an UPDATE statement,
+        nothing is done if the user is not cached.
+
+        Parameters:
+        ------
+        discord_id: `int`
+            User's Discord ID.
+        **values: `Any`
+            Column names and the new values, e.g., `last_used_time=datetime.now()`.
+        """
+        cls._user_cache_version += 1
+        cached_values = cls._user_cache.get(discord_id)
+        if cached_values is not None:
+            cached_values.update(values)
+
+    @classmethod
+    def _cache_user(cls, user: User) -> None:
+        cls._user_cache_version += 1
+        cls._user_cache[user.discord_id] = {key: getattr(user, key) for key in _user_columns}
@@ -0,0 +1,87 @@
+import asyncio
+import gzip
+import os
+import shutil
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from utility.custom_log import LOG
+
+
+class Backup:
+    """Online backup of the bot database with the SQLite backup API.
+
+    The copy runs in a worker thread and copies `pages` pages per step, so the event loop is never blocked,
+    and the database can still be written between steps. The result is a consistent snapshot
+    (SQLite restarts the copy if the database is changed by another connection during the backup).
+    """
+
+    @classmethod
+    async def run(
+        cls,
+        db_path: str = "data/bot/bot.db",
+        *,
+        pages: int = 256,
+        compress: bool = False,
+        keep: int = 0,
+    ) -> Path:
+        """Back up the database to `{db_path}_backup_{today}.db`, then remove old backups
+
+        Parameters
+        ------
+        db_path: `str`
+            Path of the database file.
+        pages: `int`
+            Number of pages copied per step.
+        compress: `bool`
+            Whether to compress the backup with gzip (`.db.gz`).
+        keep: `int`
+            Number of latest days of backups to keep, `0` means keeping all backups.
+            Both the `.db` and `.db.gz` backups of a kept day are kept.
+
+        Returns
+        ------
+        `Path`:
+            Path of the backup file.
+        """
+        src = Path(db_path)
+        dest = src.with_name(f"{src.stem}_backup_{date.today()}.db")
+        if compress:
+            dest = dest.with_suffix(".db.gz")
+        await asyncio.to_thread(cls._backup, src, dest, pages, compress)
+        if keep > 0:
+            await asyncio.to_thread(cls._remove_old_backups, src, keep)
+        return dest
+
+    @staticmethod
+    def _backup(src: Path, dest: Path, pages: int, compress: bool) -> None:
+        tmp_db = dest.with_name(dest.name + ".tmp")
+        src_conn = sqlite3.connect(src)
+        dest_conn = sqlite3.connect(tmp_db)
+        try:
+            with dest_conn:
+                src_conn.backup(dest_conn, pages=max(1, pages), sleep=0.005)
+        finally:
+            dest_conn.close()
+            src_conn.close()
+
+        if compress:
+            tmp_gz = dest.with_name(dest.name + ".gz.tmp")
+            with open(tmp_db, "rb") as f_in, gzip.open(tmp_gz, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.remove(tmp_db)
+            tmp_db = tmp_gz
+        os.replace(tmp_db, dest)
+
+    @staticmethod
+    def _remove_old_backups(src: Path, keep: int) -> None:
+        # Group by date, a day may have both a .db and a .db.gz backup
+        backups: dict[str, list[Path]] = {}
+        for path in src.parent.glob(f"{src.stem}_backup_*.db*"):
+            if path.suffixes[-1:] == [".db"] or path.suffixes[-2:] == [".db", ".gz"]:
+                backups.setdefault(path.name.split(".")[0], []).append(path)
+        for day in sorted(backups)[:-keep]:
+            for path in backups[day]:
+                os.remove(path)
+                LOG.System(f"Removed old database backup: {path}")
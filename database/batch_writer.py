@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import sentry_sdk
+
+from utility.custom_log import LOG
+from utility.prometheus import Metrics
+
+from .app import Database, DatabaseModel
+
+
+class BatchWriter:
+    """Write-behind buffer that collects updated ORM objects and writes them to the database in batches.
+
+    The buffered objects are written in a single transaction when `batch_size` objects have been collected,
+    or `flush_interval` seconds after the first object was buffered, whichever comes first.
+    Buffered updates only live in memory, so a crash loses the updates not written yet
+    (at most `batch_size` objects, or more while the database is failing).
+    When a write fails, the batch is put back into the buffer and retried with exponential backoff.
+
+    Example:
+    ```
+    async with BatchWriter("daily_checkin", batch_size=100, flush_interval=5.0) as writer:
+        await writer.add(user)
+    ```
+    """
+
+    def __init__(self, name: str, *, batch_size: int, flush_interval: float) -> None:
+        self.name = name
+        """Name of the batch writer, used in logs and metrics"""
+        self.batch_size = max(1, batch_size)
+        """Number of buffered objects that triggers a flush"""
+        self.flush_interval = flush_interval
+        """Maximum time (unit: second) a buffered object waits before being flushed"""
+        self.max_retry_delay: float = 60.0
+        """Maximum time (unit: second) between retries of a failed batch"""
+
+        self.flushed_rows: int = 0
+        """Total number of rows written by this batch writer"""
+        self.flush_count: int = 0
+        """Total number of batches written by this batch writer"""
+        self.flush_seconds: float = 0.0
+        """Total time spent writing batches (unit: second)"""
+
+        self._buffer: dict[int, DatabaseModel] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._failures: int = 0
+
+    async def __aenter__(self) -> "BatchWriter":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.flush()
+        for _ in range(3):
+            if len(self._buffer) == 0:
+                return
+            await asyncio.sleep(self._retry_delay())
+            await self.flush()
+        if len(self._buffer) > 0:
+            LOG.Error(f"BatchWriter {self.name}: gave up writing {len(self._buffer)} rows")
+            self._buffer.clear()
+
+    async def add(self, instance: DatabaseModel) -> None:
+        """Buffer an object to be inserted or replaced in the database.
+
+        Parameters
+        ------
+        instance: `DatabaseModel`
+            Instance object of the database table (ORM).
+        """
+        self._buffer[id(instance)] = instance
+        # While the database is failing, wait for the scheduled retry instead of writing on every add
+        if len(self._buffer) >= self.batch_size and self._failures == 0:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def delete(self, instance: DatabaseModel) -> None:
+        """Delete an object from the database, dropping its pending write so it is not inserted again afterwards.
+
+        Parameters
+        ------
+        instance: `DatabaseModel`
+            Instance object of the database table (ORM).
+        """
+        self._buffer.pop(id(instance), None)
+        async with self._lock:
+            # A failed flush may have put the object back while waiting for the lock
+            self._buffer.pop(id(instance), None)
+            await Database.delete_instance(instance)
+
+    async def flush(self) -> None:
+        """Write all buffered objects to the database in one transaction,
+        the objects are kept in the buffer and retried later if the write fails"""
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+        async with self._lock:
+            if len(self._buffer) == 0:
+                return
+            instances = list(self._buffer.values())
+            self._buffer.clear()
+
+            start_time = time.perf_counter()
+            try:
+                await Database.insert_or_replace_all(instances)
+            except Exception as e:
+                self._failures += 1
+                LOG.Error(f"BatchWriter {self.name}: failed to write {len(instances)} rows, retrying later: {e}")
+                sentry_sdk.capture_exception(e)
+                # Put the batch back in front, objects buffered again since then keep their place
+                self._buffer = {id(instance): instance for instance in instances} | self._buffer
+                if self._timer is None:
+                    self._timer = asyncio.create_task(self._flush_later(self._retry_delay()))
+                return
+            elapsed = time.perf_counter() - start_time
+            self._failures = 0
+
+            self.flushed_rows += len(instances)
+            self.flush_count += 1
+            self.flush_seconds += elapsed
+            Metrics.DB_BATCH_FLUSH_SECONDS.labels(self.name).observe(elapsed)
+            Metrics.DB_BATCH_FLUSH_ROWS.labels(self.name).inc(len(instances))
+
+    def summary(self) -> str:
+        """Return a short description of the rows written and the average flush latency"""
+        average = self.flush_seconds / self.flush_count if self.flush_count > 0 else 0.0
+        return (
+            f"{self.flushed_rows} rows written in {self.flush_count} batches, "
+            f"average {average * 1000:.0f} ms per batch"
+        )
+
+    def _retry_delay(self) -> float:
+        return min(self.flush_interval * 2**self._failures, self.max_retry_delay)
+
+    async def _flush_later(self, delay: float | None = None) -> None:
+        await asyncio.sleep(self.flush_interval if delay is None else delay)
+        await self.flush()
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime
+from typing import ClassVar
+
+import sqlalchemy
+
+from .app import Database
+from .models import User
+
+
+class LastUsedTracker:
+    """Collect the users who successfully used a command, and write their `last_used_time` to the database
+    periodically with bulk UPDATE statements instead of rewriting the user row on every API call.
+
+    `last_used_time` is only used to remove expired users, so the time written is the flush time,
+    at most one flush interval later than the actual last use.
+    """
+
+    _touched: ClassVar[set[int]] = set()
+    _lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+
+    @classmethod
+    def touch(cls, discord_id: int) -> None:
+        """Mark that the user has just used a command
+
+        Parameters
+        ------
+        discord_id: `int`
+            User's Discord ID.
+        """
+        cls._touched.add(discord_id)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Write `last_used_time` of all touched users to the database, return the number of users written"""
+        async with cls._lock:
+            if len(cls._touched) == 0:
+                return 0
+            discord_ids = list(cls._touched)
+            cls._touched.clear()
+
+            now = datetime.now()
+            CHUNK_SIZE = 500  # Keep the number of parameters below the SQLite limit
+            try:
+                async with Database.sessionmaker() as session:
+                    for i in range(0, len(discord_ids), CHUNK_SIZE):
+                        stmt = (
+                            sqlalchemy.update(User)
+                            .where(User.discord_id.in_(discord_ids[i : i + CHUNK_SIZE]))
+                            .values(last_used_time=now)
+                        )
+                        await session.execute(stmt)
+                    await session.commit()
+            except Exception:
+                # Keep the users so they are written in the next flush
+                cls._touched.update(discord_ids)
+                raise
+
+            for discord_id in discord_ids:
+                Database.update_cached_user(discord_id, last_used_time=now)
+            return len(discord_ids)
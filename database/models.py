@@ -1,4 +1,5 @@
 import datetime
+import hashlib
 import json
 import typing
 import zlib
@@ -105,7 +106,7 @@ class GenshinScheduleNotes(Base):
     discord_channel_id: Mapped[int]
     """ID of the Discord channel to send notification messages"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """Next check time; when checking, data will only be requested from Hoyolab if it exceeds this time"""
 
@@ -217,6 +218,11 @@ class GenshinShowcase(Base):
         data = zlib.decompress(self._raw_data).decode("utf-8")
         return json.loads(data)
 
+    @property
+    def digest(self) -> bytes:
+        """Digest of the stored data, changes whenever the data changes"""
+        return hashlib.blake2b(self._raw_data, digest_size=16).digest()
+
 
 class StarrailScheduleNotes(Base):
     """Database table for Star Rail schedule auto-check notes"""
@@ -228,7 +234,7 @@ class StarrailScheduleNotes(Base):
     discord_channel_id: Mapped[int]
     """ID of the Discord channel to send notification messages"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """Next check time; when checking, data will only be requested from Hoyolab if it exceeds this time"""
 
@@ -345,3 +351,8 @@ class StarrailShowcase(Base):
         """Mihomo API data"""
         data = zlib.decompress(self._raw_data).decode("utf-8")
         return StarrailInfoParsed.parse_raw(data)
+
+    @property
+    def digest(self) -> bytes:
+        """Digest of the stored data, changes whenever the data changes"""
+        return hashlib.blake2b(self._raw_data, digest_size=16).digest()
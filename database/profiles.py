@@ -0,0 +1,51 @@
+from typing import Final
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SQLITE_PROFILES: Final[dict[str, dict[str, str | int]]] = {
+    # SQLite defaults: rollback journal and a full fsync on every commit
+    "default": {},
+    # WAL journal, only fsync at checkpoints; a power loss may lose the last commits but never corrupts the database
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # 64 MB
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # WAL journal with a full fsync on every commit
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+"""SQLite PRAGMA settings applied to every new connection, selected by `config.database_profile`"""
+
+
+def apply_sqlite_profile(engine: AsyncEngine, profile: str) -> None:
+    """Execute the PRAGMA statements of the profile on every new connection of the engine
+
+    Parameters
+    ------
+    engine: `AsyncEngine`
+        SQLite database engine.
+    profile: `str`
+        Name of the profile in `SQLITE_PROFILES`.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}, available: {', '.join(SQLITE_PROFILES)}")
+    pragmas = SQLITE_PROFILES[profile]
+    if len(pragmas) == 0:
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for key, value in pragmas.items():
+            cursor.execute(f"PRAGMA {key}={value}")
+        cursor.close()
@@ -6,6 +6,7 @@ from utility.custom_log import LOG
 from utility.utils import get_app_command_mention
 
 from .app import Database
+from .last_used import LastUsedTracker
 from .models import User
 
 
@@ -63,6 +64,7 @@ class Tool:
         diff_days: `int`
             Remove users who have not used commands for more than this number of days
         """
+        await LastUsedTracker.flush()
         now = datetime.now()
         count = 0
         users = await Database.select_all(User)
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import os
 import re
 import textwrap
@@ -10,8 +12,64 @@ from enkanetwork.model.character import CharacterInfo
 from enkanetwork.model.equipments import Equipments, EquipmentsType, EquipType  # noqa
 from PIL import Image, ImageChops, ImageDraw, ImageEnhance
 
+from utility import RenderService
+
 from .prop_reference import RARITY_REFERENCE, SUBST_ORDER
-from .utils import (fade_asset_icon, fade_character_art, format_statistics, get_active_artifact_sets, get_font, get_stat_filename, open_image, scale_image, current_path) # noqa
+from .utils import (check_asset, fade_asset_icon, fade_character_art, format_statistics, get_active_artifact_sets, get_font, get_stat_filename, open_image, repeat_mask, scale_image, current_path) # noqa
+
+
+TEMPLATE_VERSION = 1
+"""Version of the drawing of the card, bump it when the card changes to invalidate `CardCache`"""
+
+ELEMENT_COLORS: dict[str, tuple[int, ...]] = {
+    "Pyro": (186, 140, 131),
+    "Hydro": (132, 161, 198),
+    "Dendro": (45, 142, 52),
+    "Electro": (152, 118, 173),
+    "Anemo": (82, 176, 177),
+    "Cryo": (70, 168, 186),
+    "Geo": (187, 159, 75),
+}
+"""Background color of the card of each element"""
+
+
+def get_element_color(element: str) -> tuple[int, ...]:
+    return ELEMENT_COLORS.get(element, (255, 255, 255, 50))
+
+
+@functools.lru_cache(maxsize=None)
+def get_card_background(element: str) -> Image.Image:
+    """Card background tinted with the color of the element, built once per element.
+    The image is shared, do not draw on it."""
+    background = open_image("attributes/Assets/default_enka_card.png")
+    background_color = Image.new("RGBA", background.size, get_element_color(element))
+    return ImageChops.overlay(background_color, background)
+
+
+@functools.lru_cache(maxsize=None)
+def get_constellation_overlay(element: str) -> Image.Image:
+    """Constellation overlay outlined with the color of the element, built once per element.
+    The image is shared, do not draw on it."""
+    c_overlay = open_image("attributes/Assets/enka_constellation_overlay.png", fixed_height=75).copy()
+    ImageDraw.Draw(c_overlay).ellipse(
+        (15, 15, 59, 59), fill=(50, 50, 50, 150), outline=get_element_color(element), width=2
+    )
+    return c_overlay
+
+
+@functools.lru_cache(maxsize=None)
+def get_talent_overlay() -> tuple[Image.Image, Image.Image]:
+    """Talent overlay and its mask, the overlay is pasted with the mask once instead of 4 times"""
+    talent_overlay = open_image("attributes/Assets/enka_talent_overlay.png", fixed_height=80)
+    return talent_overlay, repeat_mask(talent_overlay, 4)
+
+
+def preload_card_backgrounds() -> None:
+    """Build the backgrounds and overlays of every element in advance"""
+    for element in ELEMENT_COLORS:
+        get_card_background(element)
+        get_constellation_overlay(element)
+    get_talent_overlay()
 
 
 async def generate_image(
@@ -20,8 +78,47 @@ async def generate_image(
     locale: Language = Language.EN,
     *,
     save_locally: bool = True,
+    background: bool = False,
 ) -> BytesIO:
-    """Create language-specific asset-getter"""
+    """Download the missing assets of the character, then render the card with `RenderService`.
+    `background=True` renders the card as a low-priority job (`RenderService.render_background`)."""
+    await download_character_assets(character)
+    render = RenderService.render_background if background else RenderService.render
+    return await render(render_image, data, character, locale, save_locally=save_locally)
+
+
+async def download_character_assets(character: CharacterInfo) -> None:
+    """Download the assets used by the card of the character that do not exist locally"""
+    assets: list[tuple[str, str]] = [
+        (f"attributes/Genshin/Gacha/{character.image.banner.filename}.png", character.image.banner.url)
+    ]
+    for constellation in character.constellations:
+        assets.append((f"attributes/Genshin/UI/{constellation.icon.filename}.png", constellation.icon.url))
+    for skill in character.skills:
+        assets.append((f"attributes/Genshin/UI/{skill.icon.filename}.png", skill.icon.url))
+    for equipment in character.equipments:
+        if equipment.type == EquipmentsType.WEAPON:
+            folder = "Weapon"
+        elif equipment.type == EquipmentsType.ARTIFACT:
+            folder = "Artifact"
+        else:
+            continue
+        assets.append((f"attributes/Genshin/{folder}/{equipment.detail.icon.filename}.png", equipment.detail.icon.url))
+
+    await asyncio.gather(
+        *[check_asset(os.path.join(current_path, path), url) for path, url in dict(assets).items()]
+    )
+
+
+def render_image(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    *,
+    save_locally: bool = True,
+) -> BytesIO:
+    """Render the card of the character, the assets must be downloaded by `download_character_assets` first"""
+    # Create language-specific asset-getter
     asset_reference = Assets(lang=locale)
 
     """ COLORS """
@@ -31,29 +128,15 @@ async def generate_image(
     BEIGE = (245, 222, 179)
 
     """ BACKGROUND SETUP """
-    background = await open_image("attributes/Assets/default_enka_card.png")
-
-    background_rgb = {
-        "Pyro": (186, 140, 131),
-        "Hydro": (132, 161, 198),
-        "Dendro": (45, 142, 52),
-        "Electro": (152, 118, 173),
-        "Anemo": (82, 176, 177),
-        "Cryo": (70, 168, 186),
-        "Geo": (187, 159, 75),
-    }.get(character.element.name, (255, 255, 255, 50))
-
-    background_color = Image.new("RGBA", background.size, background_rgb)
-    background = ImageChops.overlay(background_color, background)
+    background = get_card_background(character.element.name)
 
     foreground = Image.new("RGBA", background.size, (0, 0, 0, 0))
     textground = Image.new("RGBA", background.size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(textground)
 
     """ FIRST TRIMESTER """
-    character_art = await open_image(
+    character_art = open_image(
         path=f"attributes/Genshin/Gacha/{character.image.banner.filename}.png",
-        asset_url=character.image.banner.url,
     )
     character_art = scale_image(character_art, fixed_percent=90)
     character_art = character_art.crop(
@@ -63,7 +146,7 @@ async def generate_image(
 
     foreground.paste(character_art, (0, 0), character_art)
 
-    character_shade = await open_image("attributes/Assets/enka_character_shade.png")
+    character_shade = open_image("attributes/Assets/enka_character_shade.png")
     foreground.paste(character_shade, (0, 0), character_shade)
 
     w = int(draw.textlength(f"{character.name}", font=get_font("normal", 30)))
@@ -131,8 +214,7 @@ async def generate_image(
         font=get_font("normal", 23),
     )
 
-    friendship_icon = await open_image("attributes/UI/COMPANIONSHIP.png")
-    friendship_icon = scale_image(friendship_icon, fixed_height=45)
+    friendship_icon = open_image("attributes/UI/COMPANIONSHIP.png", fixed_height=45)
     foreground.paste(friendship_icon, (34, 108), friendship_icon)
     draw.text(
         (80, 130),
@@ -142,38 +224,26 @@ async def generate_image(
     )
 
     """ Constellations Section """
-    c_overlay = await open_image("attributes/Assets/enka_constellation_overlay.png")
-    c_overlay = scale_image(c_overlay, fixed_height=75)
-    ImageDraw.Draw(c_overlay).ellipse(
-        (15, 15, 59, 59), fill=(50, 50, 50, 150), outline=background_rgb, width=2
-    )
-    lock = await open_image("attributes/UI/LOCKED.png", resize=(20, 25))
+    c_overlay = get_constellation_overlay(character.element.name)
+    lock = open_image("attributes/UI/LOCKED.png", resize=(20, 25))
 
     constellation_starting_index = 160
     for index, constellation in enumerate(character.constellations):
         foreground.paste(
             c_overlay, (25, constellation_starting_index + 60 * index), c_overlay
         )
-        constellation_icon = await open_image(
+        constellation_icon = open_image(
             path=f"attributes/Genshin/UI/{constellation.icon.filename}.png",
-            asset_url=constellation.icon.url,
+            fixed_height=45,
         )
-        constellation_icon = scale_image(constellation_icon, fixed_height=45)
 
         if index >= character.constellations_unlocked:
             f = ImageEnhance.Brightness(constellation_icon)
             constellation_icon = f.enhance(0.4)
             constellation_icon.paste(lock, (13, 8), lock)
+            mask = constellation_icon
         else:
-            for _ in range(2):
-                foreground.paste(
-                    constellation_icon,
-                    (
-                        int(63 - (constellation_icon.size[0] / 2)),
-                        constellation_starting_index + 15 + 60 * index,
-                    ),
-                    constellation_icon,
-                )
+            mask = repeat_mask(constellation_icon, 3)
 
         foreground.paste(
             constellation_icon,
@@ -181,25 +251,21 @@ async def generate_image(
                 int(63 - (constellation_icon.size[0] / 2)),
                 constellation_starting_index + 15 + 60 * index,
             ),
-            constellation_icon,
+            mask,
         )
 
     """ Talents Section """
-    talent_overlay = await open_image(f"attributes/Assets/enka_talent_overlay.png") # noqa
-    talent_overlay = scale_image(talent_overlay, fixed_height=80)
+    talent_overlay, talent_overlay_mask = get_talent_overlay()
 
     for index, skill in enumerate(character.skills):
-        for _ in range(4):
-            foreground.paste(talent_overlay, (430, 305 + 90 * index), talent_overlay)
+        foreground.paste(talent_overlay, (430, 305 + 90 * index), talent_overlay_mask)
 
-        sk = await open_image(
+        sk = open_image(
             path=f"attributes/Genshin/UI/{skill.icon.filename}.png",
-            asset_url=skill.icon.url,
             resize=(50, 50),
         )
 
-        for _ in range(3):
-            foreground.paste(sk, (int(471 - (sk.size[0] / 2)), 320 + 90 * index), sk)
+        foreground.paste(sk, (int(471 - (sk.size[0] / 2)), 320 + 90 * index), repeat_mask(sk, 3))
 
         w = int(draw.textlength(str(skill.level), font=get_font("normal", 20)))
         ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
@@ -221,27 +287,23 @@ async def generate_image(
         )
 
     weapon = character.equipments[-1]
-    weapon_image = await open_image(
+    weapon_image = open_image(
         path=f"attributes/Genshin/Weapon/{weapon.detail.icon.filename}.png",
-        asset_url=weapon.detail.icon.url,
+        fixed_height=125,
     )
-    weapon_image = scale_image(weapon_image, fixed_height=125)
 
     foreground.paste(weapon_image, (555, 25), weapon_image)
 
-    rarity_light = scale_image(
-        await open_image(
-            f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}_WEAPON_LIGHT.png"
-        ),
+    rarity_light = open_image(
+        f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}_WEAPON_LIGHT.png",
         fixed_height=40,
     )
     foreground.paste(
         rarity_light, (int(625 - (rarity_light.size[0] / 2)), 130), rarity_light
     )
 
-    rarity = scale_image(
-        await open_image(f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png"),
-        fixed_height=25,
+    rarity = open_image(
+        f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png", fixed_height=25
     )
 
     dark_shadow = ImageEnhance.Brightness(rarity).enhance(0)
@@ -254,7 +316,7 @@ async def generate_image(
         draw.textlength(f"{weapon.detail.name}", font=get_font("normal", 22))
     )
 
-    async def draw_weapon_information(line_buffer: int = 0):
+    def draw_weapon_information(line_buffer: int = 0):
         # Weapon Main Stat
         mainstat = weapon.detail.mainstats
         w = int(
@@ -272,12 +334,10 @@ async def generate_image(
             radius=4,
         )
 
-        image = await open_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png")
-        icon_file = scale_image(image, fixed_height=30)
+        icon_file = open_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png", fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
-        for _ in range(3):
-            textground.paste(icon_file, (695, 63 + line_buffer), icon_file)
+        textground.paste(icon_file, (695, 63 + line_buffer), repeat_mask(icon_file, 3))
 
         draw.text(
             (735, 65 + line_buffer),
@@ -309,16 +369,12 @@ async def generate_image(
                 radius=4,
             )
 
-            image = await open_image(
-                f"attributes/UI/{get_stat_filename(substat.prop_id)}.png"
-            )
-            icon_file = scale_image(image, fixed_height=30)
+            icon_file = open_image(f"attributes/UI/{get_stat_filename(substat.prop_id)}.png", fixed_height=30)
             icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
-            for _ in range(3):
-                textground.paste(
-                    icon_file, (int(endpoint + 15), 63 + line_buffer), icon_file
-                )
+            textground.paste(
+                icon_file, (int(endpoint + 15), 63 + line_buffer), repeat_mask(icon_file, 3)
+            )
 
             draw.text(
                 (endpoint + 55, 65 + line_buffer),
@@ -394,7 +450,7 @@ async def generate_image(
             (690, 32), f"{weapon.detail.name}", font=get_font("normal", 22), anchor="lt"
         )
 
-        await draw_weapon_information(line_buffer=5)
+        draw_weapon_information(line_buffer=5)
     else:
         weapon_name = textwrap.wrap(f"{weapon.detail.name}", width=20)
 
@@ -403,20 +459,18 @@ async def generate_image(
                 (690, 32 + (index * 25)), line, font=get_font("normal", 22), anchor="lt"
             )
 
-        await draw_weapon_information(line_buffer=28 * index)
+        draw_weapon_information(line_buffer=28 * index)
 
     all_stats = format_statistics(character)
     statistic_buffer = 365 // len(all_stats)
     for index, item in enumerate(all_stats):
         """Draw Icon for Stat"""
-        image = await open_image(f"attributes/UI/{get_stat_filename(item)}.png")
-        icon_file = scale_image(image, fixed_height=30)
+        icon_file = open_image(f"attributes/UI/{get_stat_filename(item)}.png", fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
-        for _ in range(3):
-            foreground.paste(
-                icon_file, (555, 180 + (index * statistic_buffer)), icon_file
-            )
+        foreground.paste(
+            icon_file, (555, 180 + (index * statistic_buffer)), repeat_mask(icon_file, 3)
+        )
 
         """ Write Stat Name """
         draw.text(
@@ -494,9 +548,8 @@ async def generate_image(
             continue
 
         artif_icon = fade_asset_icon(
-            await open_image(
+            open_image(
                 path=f"attributes/Genshin/Artifact/{artifact.detail.icon.filename}.png",
-                asset_url=artifact.detail.icon.url,
                 resize=(190, 190),
             ),
             "artifact",
@@ -517,16 +570,14 @@ async def generate_image(
             width=2,
         )
 
-        image = await open_image(
-            f"attributes/UI/{get_stat_filename(artifact.detail.mainstats.prop_id)}.png"
+        icon_file = open_image(
+            f"attributes/UI/{get_stat_filename(artifact.detail.mainstats.prop_id)}.png", fixed_height=30
         )
-        icon_file = scale_image(image, fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
-        for _ in range(3):
-            foreground.paste(
-                icon_file, (1125, 25 + artifact_spacer * artif_index), icon_file
-            )
+        foreground.paste(
+            icon_file, (1125, 25 + artifact_spacer * artif_index), repeat_mask(icon_file, 3)
+        )
 
         mainstat = artifact.detail.mainstats
         draw.text(
@@ -558,10 +609,8 @@ async def generate_image(
             fill=WHITE,
         )
 
-        rarity = scale_image(
-            await open_image(
-                f"attributes/UI/{RARITY_REFERENCE[str(artifact.detail.rarity)]}.png"
-            ),
+        rarity = open_image(
+            f"attributes/UI/{RARITY_REFERENCE[str(artifact.detail.rarity)]}.png",
             fixed_height=18,
         )
 
@@ -579,8 +628,7 @@ async def generate_image(
 
             position = {0: [0, 0], 1: [1, 0], 2: [0, 1], 3: [1, 1]}.get(index)
 
-            image = await open_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png")
-            icon_file = scale_image(image, fixed_height=30)
+            icon_file = open_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png", fixed_height=30)
             icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
             foreground.paste(
@@ -607,7 +655,7 @@ async def generate_image(
         (555, 547, 555 + 48, 547 + 48), fill=(0, 0, 0, 50), radius=5
     )
 
-    flower_of_life = await open_image(
+    flower_of_life = open_image(
         "attributes/Assets/flower_of_life_icon.png", resize=(35, 35)
     )
     foreground.paste(flower_of_life, (562, 555), flower_of_life)
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+
+import enkanetwork
+from enkanetwork import Assets
+
+from utility import LOG, config
+
+from .utils import current_path, download_asset
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+"""Called with (number of finished assets, number of missing assets) while prefetching"""
+
+
+def collect_missing_assets() -> list[tuple[str, str]]:
+    """Return (local path, url) of the character assets in `enkanetwork.Assets` that do not exist locally:
+    gacha arts, costume arts, constellation icons, skill icons and the avatars used by the abyss card.
+
+    Weapon and artifact icons are not listed in the Enka assets data, so they are still downloaded on first use.
+    """
+    assets: dict[str, str] = {}
+
+    def add(path: str, url: str) -> None:
+        if url and path not in assets:
+            assets[path] = url
+
+    for character_id in Assets.DATA.get("characters", {}):
+        character = Assets.character(character_id)
+        if character is None:
+            continue
+        banner = character.images.banner
+        add(os.path.join(current_path, f"attributes/Genshin/Gacha/{banner.filename}.png"), banner.url)
+        add(f"data/image/character/{character.id}.png", character.images.icon.url)
+        for constellation_id in character.constellations:
+            if (constellation := Assets.constellations(constellation_id)) is not None:
+                icon = constellation.icon
+                add(os.path.join(current_path, f"attributes/Genshin/UI/{icon.filename}.png"), icon.url)
+        for skill_id in character.skills:
+            if (skill := Assets.skills(skill_id)) is not None:
+                icon = skill.icon
+                add(os.path.join(current_path, f"attributes/Genshin/UI/{icon.filename}.png"), icon.url)
+
+    for costume_id in Assets.DATA.get("costumes", {}):
+        if (costume := Assets.character_costume(costume_id)) is not None:
+            banner = costume.images.banner
+            add(os.path.join(current_path, f"attributes/Genshin/Gacha/{banner.filename}.png"), banner.url)
+
+    return [(path, url) for path, url in assets.items() if not os.path.exists(path)]
+
+
+async def update_enka_assets() -> None:
+    """Download the latest Enka assets data (character, costume, skill data and text maps) and reload it"""
+    client = enkanetwork.EnkaNetworkAPI()
+    async with client:
+        await client.update_assets()
+    Assets(lang=enkanetwork.Language.EN)
+
+
+async def prefetch_assets(progress: ProgressCallback | None = None) -> tuple[int, int]:
+    """Download every missing character asset, at most `config.enka_prefetch_concurrency` at the same time,
+    so the first card drawn after a game update does not wait for the downloads.
+
+    Parameters
+    ------
+    progress: `ProgressCallback | None`
+        Called after every 10% of the assets are finished.
+
+    Returns
+    ------
+    `tuple[int, int]`:
+        (number of downloaded assets, number of failed assets)
+    """
+    missing = await asyncio.to_thread(collect_missing_assets)
+    total = len(missing)
+    if total == 0:
+        return 0, 0
+
+    LOG.System(f"Prefetching {total} Enka assets")
+    start_time = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, config.enka_prefetch_concurrency))
+    step = max(1, total // 10)
+    finished = 0
+    failed = 0
+
+    async def download(path: str, url: str) -> None:
+        nonlocal finished, failed
+        async with semaphore:
+            try:
+                await download_asset(path, url)
+            except Exception as e:
+                failed += 1
+                LOG.Error(f"Failed to prefetch Enka asset {url}: {e}")
+        finished += 1
+        if progress is not None and (finished % step == 0 or finished == total):
+            await progress(finished, total)
+
+    await asyncio.gather(*[download(path, url) for path, url in missing])
+    LOG.System(
+        f"Prefetched {total - failed}/{total} Enka assets in {time.perf_counter() - start_time:.1f} seconds"
+    )
+    return total - failed, failed
@@ -2,20 +2,34 @@ import asyncio
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import aiohttp
+from utility import HttpSession, TokenBucket, config
 
 from .api import EnkaAPI, EnkaError
 
+_rate_limiter: TokenBucket | None = None
+"""Rate limiter shared by every request to the Enka API"""
+
+
+def _get_rate_limiter() -> TokenBucket:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucket(config.enka_rate, config.enka_rate_burst)
+    return _rate_limiter
+
 
 async def fetch_enka_data(
     uid: int, cache_data: Optional[Dict[str, Any]] = None, retry: int = 1
 ) -> Dict[str, Any]:
-    async with aiohttp.request(
-        "GET",
+    """Fetch the showcase data from the Enka API. Requests go through a global rate limiter,
+    which slows down when Enka responds 429 and waits for `Retry-After` if it is given."""
+    rate_limiter = _get_rate_limiter()
+    await rate_limiter.acquire()
+    async with HttpSession.get().get(
         EnkaAPI.get_user_data_url(uid),
         headers={"User-Agent": "KT-Yeh/Genshin-Discord-Bot"},
     ) as resp:
         if resp.status == 200:
+            rate_limiter.reward()
             resp_data: Dict[str, Any] = await resp.json()
             resp_data["timestamp"] = int(datetime.now().timestamp())
             raw_data = (
@@ -28,6 +42,12 @@ async def fetch_enka_data(
                     raise EnkaError.WrongUIDFormat()
                 case 404:
                     raise EnkaError.PlayerNotExist()
+                case 429:
+                    rate_limiter.penalize()
+                    try:
+                        rate_limiter.pause(float(resp.headers.get("Retry-After", 0)))
+                    except ValueError:
+                        pass
             if retry > 0:
                 await asyncio.sleep(0.5)
                 return await fetch_enka_data(uid, cache_data, retry=retry - 1)
@@ -1,51 +1,122 @@
+import asyncio
+import functools
 import io
 from datetime import datetime
-from typing import Any
+from typing import Any, ClassVar
 
 import discord
 import enkanetwork
+from cachetools import LRUCache
 
 from database import Database, GenshinShowcase
-from utility import emoji
+from utility import LOG, CardCache, config, emoji
 
 from .api import EnkaAPI
-from .enka_card import generate_image
+from .enka_card import TEMPLATE_VERSION, generate_image
 from .request import fetch_enka_data
 
 enka_assets = enkanetwork.Assets(lang=enkanetwork.Language.EN)
 
 
 class Showcase:
+    _refresh_tasks: ClassVar[dict[int, asyncio.Task[tuple[dict[str, Any], enkanetwork.EnkaNetworkResponse]]]] = {}
+    """Refreshes in progress, key: UID"""
+    _parsed_data: ClassVar[LRUCache[int, tuple[bytes, dict[str, Any], enkanetwork.EnkaNetworkResponse]]] = LRUCache(
+        config.showcase_cache_size
+    )
+    """Parsed data shared by every instance, key: UID, value: (digest of the database row, raw data, parsed data)"""
+    _refresh_errors: ClassVar[LRUCache[int, str]] = LRUCache(config.showcase_cache_size)
+    """Error of the last failed background refresh, key: UID; removed when a refresh succeeds"""
+
     def __init__(self, uid: int) -> None:
         self.raw_data: dict[str, Any] | None = None
         self.data: enkanetwork.EnkaNetworkResponse
         self.uid: int = uid
         self.is_cached_data = False
+        self.is_refreshing = False
+        """The data is expired and being refreshed in the background"""
         self.api_error_msg: str | None = None
         self.url: str = EnkaAPI.get_user_url(uid)
-        self.image_buffers: list[io.BytesIO | None] = [None] * 25
+        self._prerender_task: asyncio.Task | None = None
 
     async def load_data(self) -> None:
+        """Load the showcase data. Data in the database is used right away even if it is expired
+        (stale-while-revalidate), and the expired data is refreshed in the background."""
         gshowcase = await Database.select_one(GenshinShowcase, GenshinShowcase.uid.is_(self.uid))
-        if gshowcase is not None:
-            self.raw_data = gshowcase.data
-
-        if self.raw_data is None:
-            self.raw_data = await fetch_enka_data(self.uid)
-        else:
-            refresh_timestamp = self.raw_data.get("timestamp", 0) + self.raw_data.get("ttl", 0)
-            if datetime.now().timestamp() > refresh_timestamp:
-                try:
-                    self.raw_data = await fetch_enka_data(self.uid, self.raw_data)
-                except Exception as e:
-                    self.is_cached_data = True
-                    self.api_error_msg = str(e)
-
-        if self.is_cached_data is False:
-            gshowcase = GenshinShowcase(self.uid, self.raw_data)
-            await Database.insert_or_replace(gshowcase)
-
-        self.data = enkanetwork.EnkaNetworkResponse.parse_obj(self.raw_data)
+        if gshowcase is None:
+            self.raw_data, self.data = await asyncio.shield(self.refresh(self.uid))
+            return
+
+        self.raw_data, self.data = self._parse(gshowcase)
+        refresh_timestamp = self.raw_data.get("timestamp", 0) + self.raw_data.get("ttl", 0)
+        if datetime.now().timestamp() > refresh_timestamp:
+            self.refresh(self.uid, self.raw_data)
+            self.is_cached_data = True
+            self.is_refreshing = True
+            self.api_error_msg = self._refresh_errors.get(self.uid)
+
+    @classmethod
+    def invalidate(cls, uid: int) -> None:
+        """Remove the parsed data of the UID from the cache, call this after deleting the showcase of the UID"""
+        cls._parsed_data.pop(uid, None)
+
+    @classmethod
+    def _parse(
+        cls, gshowcase: GenshinShowcase
+    ) -> tuple[dict[str, Any], enkanetwork.EnkaNetworkResponse]:
+        """Decompress and parse the database row; a row that has not changed since it was last parsed
+        is served from the cache. The returned objects are shared, do not modify them."""
+        digest = gshowcase.digest
+        cached = cls._parsed_data.get(gshowcase.uid)
+        if cached is not None and cached[0] == digest:
+            return cached[1], cached[2]
+
+        raw_data = gshowcase.data
+        data = enkanetwork.EnkaNetworkResponse.parse_obj(raw_data)
+        cls._parsed_data[gshowcase.uid] = (digest, raw_data, data)
+        return raw_data, data
+
+    @classmethod
+    def refresh(
+        cls, uid: int, cache_data: dict[str, Any] | None = None
+    ) -> asyncio.Task[tuple[dict[str, Any], enkanetwork.EnkaNetworkResponse]]:
+        """Fetch the latest data of the UID from Enka and save it to the database.
+        Concurrent refreshes of the same UID share one request.
+
+        Returns
+        ------
+        `asyncio.Task[tuple[dict[str, Any], EnkaNetworkResponse]]`:
+            Task of the refresh, the result is the latest (raw data, parsed data).
+            Await it with `asyncio.shield`, so the shared task is not cancelled with the caller.
+        """
+        task = cls._refresh_tasks.get(uid)
+        if task is None:
+            task = asyncio.create_task(cls._refresh(uid, cache_data))
+            cls._refresh_tasks[uid] = task
+            task.add_done_callback(functools.partial(cls._on_refresh_done, uid))
+        return task
+
+    @classmethod
+    async def _refresh(
+        cls, uid: int, cache_data: dict[str, Any] | None
+    ) -> tuple[dict[str, Any], enkanetwork.EnkaNetworkResponse]:
+        raw_data = await fetch_enka_data(uid, cache_data)
+        gshowcase = GenshinShowcase(uid, raw_data)
+        await Database.insert_or_replace(gshowcase)
+        data = enkanetwork.EnkaNetworkResponse.parse_obj(raw_data)
+        cls._parsed_data[uid] = (gshowcase.digest, raw_data, data)
+        cls._refresh_errors.pop(uid, None)
+        return raw_data, data
+
+    @classmethod
+    def _on_refresh_done(
+        cls, uid: int, task: asyncio.Task[tuple[dict[str, Any], enkanetwork.EnkaNetworkResponse]]
+    ) -> None:
+        if cls._refresh_tasks.get(uid) is task:
+            del cls._refresh_tasks[uid]
+        if not task.cancelled() and (e := task.exception()) is not None:
+            LOG.Error(f"Failed to refresh the Enka showcase of UID {uid}: {e}")
+            cls._refresh_errors[uid] = str(e)
 
     def get_player_overview_embed(self) -> discord.Embed:
         player = self.data.player
@@ -59,7 +130,11 @@ class Showcase:
             f"Achievements: {player.achievement}\n"
             f"Spiral Abyss: {player.abyss_floor}-{player.abyss_room}\n"
             f"Next Refresh Time: <t:{self.raw_data.get('timestamp', 0) + self.raw_data.get('ttl', 0)}:R>\n"
-            + (f"({self.api_error_msg}, displayed data is cached)" if self.is_cached_data is True else ""),
+            + (
+                f"({self.api_error_msg}, displayed data is cached)"
+                if self.is_cached_data is True and self.api_error_msg is not None
+                else ""
+            ),
         )
 
         if player.avatar and player.avatar.icon:
@@ -68,7 +143,10 @@ class Showcase:
         if player.namecard.icon and player.namecard.banner:
             embed.set_image(url=player.namecard.banner.url)
 
-        embed.set_footer(text=f"UID: {self.uid}")
+        footer = f"UID: {self.uid}"
+        if self.is_refreshing:
+            footer += " | Updating in the background, displayed data is cached"
+        embed.set_footer(text=footer)
         return embed
 
     def get_character_stat_embed(self, index: int) -> discord.Embed:
@@ -256,22 +334,45 @@ class Showcase:
             )
         return embed
 
-    async def get_image(self, index: int) -> io.BytesIO | None:
+    def start_prerender(self) -> None:
+        """Render the cards of all characters into `CardCache` in the background with low priority,
+        so selecting a character later does not wait for rendering. Disabled by `config.showcase_prerender`."""
+        if config.showcase_prerender is False or self.data.characters is None or self._prerender_task is not None:
+            return
+        self._prerender_task = asyncio.create_task(self._prerender())
+
+    def cancel_prerender(self) -> None:
+        """Stop rendering cards in the background, call this when the showcase is no longer shown"""
+        if self._prerender_task is not None:
+            self._prerender_task.cancel()
+
+    async def _prerender(self) -> None:
+        for index in range(len(self.data.characters or [])):
+            try:
+                await self.get_image(index, background=True)
+            except Exception as e:
+                LOG.Error(f"Failed to pre-render the Enka card of UID {self.uid}: {e}")
+                return
+
+    async def get_image(self, index: int, *, background: bool = False) -> io.BytesIO | None:
+        """Get the card of the character, `background=True` renders the card as a low-priority job"""
         if self.data.characters is None:
             return None
 
-        if (image_buffer := self.image_buffers[index]) is not None:
-            image = image_buffer
-            image.seek(0)
-        else:
-            image = await generate_image(
-                self.data,
-                self.data.characters[index],
-                enkanetwork.Language.EN,
-                save_locally=False,
-            )
-            self.image_buffers[index] = image
-        return image
+        character = self.data.characters[index]
+        locale = enkanetwork.Language.EN
+        key = CardCache.make_key(
+            "enka",
+            TEMPLATE_VERSION,
+            self.uid,
+            self.data.player.json(include={"nickname", "level", "world_level"}),
+            character.json(),
+            locale.value,
+        )
+        return await CardCache.get_or_render(
+            key,
+            lambda: generate_image(self.data, character, locale, save_locally=False, background=background),
+        )
 
     def get_default_embed(self, index: int) -> discord.Embed:
         character = self.data.player.characters_preview[index]
@@ -1,8 +1,11 @@
+import asyncio
+import functools
 import os
+import tempfile
 from collections import Counter
+from io import BytesIO
 from typing import List, Literal
 
-import aiohttp
 from enkanetwork.enum import EquipmentsType
 from enkanetwork.model import Stats
 from enkanetwork.model.character import CharacterInfo
@@ -10,6 +13,9 @@ from enkanetwork.model.equipments import EquipmentsType # noqa
 from PIL import Image, ImageChops, ImageFont, ImageOps
 from pydantic import BaseModel
 
+from utility import HttpSession, ImageCache
+from utility.fonts import load_font, preload_fonts
+
 from .prop_reference import ELEMENT_REFERENCE, RELIQUARY_STATS
 
 current_path = os.path.dirname(os.path.abspath(__file__))
@@ -30,36 +36,57 @@ async def check_asset(path: str, asset_url: str) -> None:
     if os.path.exists(path):
         return
 
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    await download_asset(path, asset_url)
+
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(asset_url) as response:
-            if response.status != 200:
-                raise Exception("There was an error downloading the asset.")
-            content = await response.read()
+async def download_asset(path: str, asset_url: str) -> None:
+    """Download the asset to the path. The image is verified before it is written,
+    and it is written to a temporary file first, so a partial file is never seen at `path`."""
+    async with HttpSession.get().get(asset_url) as response:
+        if response.status != 200:
+            raise Exception("There was an error downloading the asset.")
+        content = await response.read()
 
-    with open(path, "wb") as f:
-        f.write(content)
+    await asyncio.to_thread(_write_asset, path, content)
 
 
-async def open_image(
+def _write_asset(path: str, content: bytes) -> None:
+    # Raise an exception if the content is not a complete image
+    with Image.open(BytesIO(content)) as image:
+        image.verify()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def open_image(
     path: str,
-    asset_url: str = None,
     mode: str = "RGBA",
     resize: tuple = None,
     resample: int = Image.BICUBIC,
+    *,
+    fixed_height: int = None,
 ) -> Image:
-    path = os.path.join(current_path, path)
-    if not os.path.exists(path):
-        await check_asset(path, asset_url)
+    """Open a local asset, remote assets must be downloaded with `check_asset` first.
+    The decoded image is cached by `ImageCache` and shared, call `.copy()` before drawing on it.
 
-    image = Image.open(path)
-    image = image.convert(mode)
+    `fixed_height` scales the image to the height while keeping the aspect ratio, same as `scale_image`.
+    """
+    path = os.path.join(current_path, path)
 
-    if resize:
-        image = image.resize(resize, resample)
+    if fixed_height:
+        image = ImageCache.get(path, mode)
+        wpercent = fixed_height / float(image.size[1])
+        resize = (int((float(image.size[0]) * float(wpercent))), fixed_height)
 
-    return image
+    return ImageCache.get(path, mode, resize, resample)
 
 
 def scale_image(
@@ -86,18 +113,43 @@ def scale_image(
         )
 
 
+FONTS = {
+    "normal": current_path + "/attributes/Fonts/JA-JP.TTF",
+    # Insert other fonts you'd like to use here, if any
+}
+
+FONT_SIZES = {
+    "normal": [12, 14, 16, 17, 18, 20, 22, 23, 27, 30],
+}
+"""Font sizes used by the card, loaded in advance by `preload_card_fonts`"""
+
+
 def get_font(font: Literal["normal"], size: int) -> ImageFont.FreeTypeFont:
     """Helper method to get a font."""
-    return {
-        "normal": ImageFont.truetype(current_path + "/attributes/Fonts/JA-JP.TTF", size),
-        # Insert other fonts you'd like to use here, if any
-    }.get(font, ImageFont.truetype(current_path + "/attributes/Fonts/JA-JP.TTF", size))
+    return load_font(FONTS.get(font, FONTS["normal"]), size)
+
+
+def preload_card_fonts() -> None:
+    """Load all fonts used by the card in advance"""
+    preload_fonts({FONTS[font]: sizes for font, sizes in FONT_SIZES.items()})
+
+
+@functools.lru_cache(maxsize=None)
+def _repeat_mask_table(times: int) -> list[int]:
+    return [round(255 - 255 * ((255 - alpha) / 255) ** times) for alpha in range(256)]
+
+
+def repeat_mask(im: Image, times: int) -> Image:
+    """Mask for pasting `im` once with the same result as pasting it with its own alpha `times` times,
+    i.e., the alpha `a` becomes `1 - (1 - a) ** times` (results may differ by 1-2 levels due to 8-bit rounding)"""
+    return im.getchannel("A").point(_repeat_mask_table(times))
 
 
 def fade_character_art(im: Image) -> Image:
     # Load mask from attributes
-    mask = Image.open(current_path + "/attributes/Assets/enka_character_mask.png").convert("L")
-    mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
+    mask = ImageCache.get(
+        current_path + "/attributes/Assets/enka_character_mask.png", "L", im.size, Image.NEAREST
+    )
 
     # Extract alpha channel from original image
     alpha = im.split()[-1]
@@ -119,8 +171,7 @@ def fade_asset_icon(im: Image, _type: Literal["artifact"]) -> Image:
         # Insert other masks you'd like to use here, if any
     }.get(_type)
 
-    mask = Image.open(mask_fp).convert("L")
-    mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
+    mask = ImageCache.get(mask_fp, "L", im.size, Image.NEAREST)
 
     overlay = Image.new("RGBA", im.size, (0, 0, 0, 0))
     overlay.paste(im, (0, 0), mask)
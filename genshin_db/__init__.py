@@ -2,3 +2,5 @@ from .api import API
 from .models import *
 from .parsers import parse
 from .request import *
+from .search import SearchIndex
+from .snapshot import GenshinDb
@@ -1,7 +1,7 @@
 import enum
 from typing import Any, ClassVar, Union
 
-import aiohttp
+from utility import HttpSession
 
 
 class API:
@@ -61,14 +61,13 @@ class API:
             "queryLanguages": queryLanguages,
             "resultLanguage": resultLanguage,
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    raise Exception(
-                        f"Unable to retrieve content from the genshin-db API: url={url} params={str(params)}"
-                    )
-                data = await response.json(encoding="utf-8")
-                return data
+        async with HttpSession.get().get(url, params=params) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"Unable to retrieve content from the genshin-db API: url={url} params={str(params)}"
+                )
+            data = await response.json(encoding="utf-8")
+            return data
 
     @classmethod
     def get_image_url(cls, image_name: str) -> str:
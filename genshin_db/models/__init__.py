@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..search import normalize
 
 from .achievements import Achievement, Achievements
 from .artifacts import Artifact, Artifacts
@@ -39,15 +42,54 @@ class GenshinDbAllData:
     tcg_cards: TCGCards
     weapons: Weapons
 
+    _index: dict[str, tuple[str, GenshinDbItem]] = field(init=False, repr=False, compare=False)
+    """Name index of all categories, key: name, alias or normalized name, value: (category, item)"""
+
+    def __post_init__(self) -> None:
+        self._build_index()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The index is rebuilt after loading, keep it out of the snapshot
+        state = self.__dict__.copy()
+        state.pop("_index", None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._build_index()
+
+    def _build_index(self) -> None:
+        # Same precedence as the categories were searched one by one before:
+        # exact names first, then aliases, then the normalized names and aliases
+        categories: list[tuple[str, list[GenshinDbItem]]] = [
+            ("achievements", self.achievements.list),
+            ("tcg_cards", self.tcg_cards.list),
+            ("weapons", self.weapons.list),
+            ("foods", self.foods.list),
+            ("materials", self.materials.list),
+            ("artifacts", self.artifacts.list),
+            ("characters", self.characters.list),
+            ("constellations", self.constellations.list),
+            ("talents", self.talents.list),
+        ]
+        index: dict[str, tuple[str, GenshinDbItem]] = {}
+        for category, items in categories:
+            for item in items:
+                index.setdefault(item.name, (category, item))
+        for category, items in categories:
+            for item in items:
+                for alias in item.aliases:
+                    index.setdefault(alias, (category, item))
+        for category, items in categories:
+            for item in items:
+                for name in [item.name, *item.aliases]:
+                    index.setdefault(normalize(name), (category, item))
+        self._index = index
+
+    def lookup(self, item_name: str) -> tuple[str, GenshinDbItem] | None:
+        """Find the item by its name or alias, case-insensitive, return (category, item)"""
+        return self._index.get(item_name) or self._index.get(normalize(item_name))
+
     def find(self, item_name: str) -> GenshinDbItem | None:
-        return (
-            self.achievements.find(item_name)
-            or self.tcg_cards.find(item_name)
-            or self.weapons.find(item_name)
-            or self.foods.find(item_name)
-            or self.materials.find(item_name)
-            or self.artifacts.find(item_name)
-            or self.characters.find(item_name)
-            or self.constellations.find(item_name)
-            or self.talents.find(item_name)
-        )
+        result = self.lookup(item_name)
+        return result[1] if result is not None else None
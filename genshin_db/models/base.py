@@ -6,6 +6,7 @@ from pydantic import BaseModel, PrivateAttr
 class GenshinDbBase(BaseModel):
 
     name: str
+    aliases: List[str] = []
 
 
 T = TypeVar("T", bound=GenshinDbBase)
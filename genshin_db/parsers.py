@@ -1,4 +1,4 @@
-from typing import Callable, Type
+from typing import Any, Callable, Type
 
 import discord
 
@@ -10,7 +10,32 @@ from .models.artifacts import Artifact, PartDetail
 from .models.tcg_cards import ActionCard, CharacterCard, DiceCost, Summon
 
 
+_embed_cache: dict[int, tuple[Any, dict[str, Any]]] = {}
+"""Embeds of the parsed items, key: id(item), value: (item, embed dict).
+The item is kept in the cache so its id cannot be reused by another object"""
+
+
+def _copy_embed_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Copy the nested containers, so changing the returned embed does not change the cache"""
+    return {
+        key: [field.copy() for field in value]
+        if key == "fields"
+        else (value.copy() if isinstance(value, dict) else value)
+        for key, value in data.items()
+    }
+
+
+def clear_embed_cache() -> None:
+    """Remove all cached embeds, call this when the genshin-db data is replaced"""
+    _embed_cache.clear()
+
+
 def parse(model) -> discord.Embed:
+    """Parse the genshin-db item into an embed, the embed of each item is only built once"""
+    cached = _embed_cache.get(id(model))
+    if cached is not None and cached[0] is model:
+        return discord.Embed.from_dict(_copy_embed_dict(cached[1]))
+
     _map: dict[Type, Callable] = {
         CharacterCard: TCGCardParser.parse_character_card,
         ActionCard: TCGCardParser.parse_action_card,
@@ -27,7 +52,9 @@ def parse(model) -> discord.Embed:
     }
     parser = _map.get(type(model))
     if parser is not None:
-        return parser(model)
+        embed: discord.Embed = parser(model)
+        _embed_cache[id(model)] = (model, _copy_embed_dict(embed.to_dict()))
+        return embed
     else:
         return EmbedTemplate.error("An error occurred, unable to parse data")
 
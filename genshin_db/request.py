@@ -1,4 +1,5 @@
-from typing import Any, Tuple
+import asyncio
+from typing import Any, Dict
 
 from .api import API
 from .models import (
@@ -21,68 +22,28 @@ async def _request(folder: API.GenshinDBFolder) -> Any:
     )
 
 
-async def fetch_cards() -> TCGCards:
+async def fetch_raw() -> Dict[str, Any]:
+    """Fetch every folder at the same time, return the raw JSON data, key: folder name"""
+    folders = list(API.GenshinDBFolder)
+    results = await asyncio.gather(*[_request(folder) for folder in folders])
+    return {folder.value: result for folder, result in zip(folders, results)}
 
-    action_cards = await _request(API.GenshinDBFolder.TCG_ACTION_CARDS)
-    character_cards = await _request(API.GenshinDBFolder.TCG_CHARACTER_CARDS)
-    summons = await _request(API.GenshinDBFolder.TCG_SUMMONS)
-
-    return TCGCards(action_cards, character_cards, summons)
-
-
-async def fetch_achievements() -> Achievements:
-    data = await _request(API.GenshinDBFolder.ACHIEVEMENTS)
-    return Achievements.parse_obj(data)
-
-
-async def fetch_characters() -> Tuple[Characters, Constellations, Talents]:
-    data = await _request(API.GenshinDBFolder.CHARACTERS)
-    characters = Characters.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.CONSTELLATIONS)
-    constellations = Constellations.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.TALENTS)
-    talents = Talents.parse_obj(data)
-
-    return characters, constellations, talents
-
-
-async def fetch_materials() -> Tuple[Materials, Foods]:
-    data = await _request(API.GenshinDBFolder.MATERIALS)
-    materials = Materials.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.FOODS)
-    foods = Foods.parse_obj(data)
-
-    return materials, foods
-
-
-async def fetch_equipments() -> Tuple[Artifacts, Weapons]:
-    data = await _request(API.GenshinDBFolder.ARTIFACTS)
-    artifacts = Artifacts.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.WEAPONS)
-    weapons = Weapons.parse_obj(data)
-
-    return artifacts, weapons
-
-
-async def fetch_all() -> GenshinDbAllData:
-    tcg_cards = await fetch_cards()
-    achievements = await fetch_achievements()
-    characters, constellations, talents = await fetch_characters()
-    materials, foods = await fetch_materials()
-    artifacts, weapons = await fetch_equipments()
 
+def parse_all(raw: Dict[str, Any]) -> GenshinDbAllData:
+    """Parse the raw data returned by `fetch_raw`"""
+    Folder = API.GenshinDBFolder
     return GenshinDbAllData(
-        achievements,
-        artifacts,
-        characters,
-        constellations,
-        foods,
-        materials,
-        talents,
-        tcg_cards,
-        weapons,
+        Achievements.parse_obj(raw[Folder.ACHIEVEMENTS.value]),
+        Artifacts.parse_obj(raw[Folder.ARTIFACTS.value]),
+        Characters.parse_obj(raw[Folder.CHARACTERS.value]),
+        Constellations.parse_obj(raw[Folder.CONSTELLATIONS.value]),
+        Foods.parse_obj(raw[Folder.FOODS.value]),
+        Materials.parse_obj(raw[Folder.MATERIALS.value]),
+        Talents.parse_obj(raw[Folder.TALENTS.value]),
+        TCGCards(
+            raw[Folder.TCG_ACTION_CARDS.value],
+            raw[Folder.TCG_CHARACTER_CARDS.value],
+            raw[Folder.TCG_SUMMONS.value],
+        ),
+        Weapons.parse_obj(raw[Folder.WEAPONS.value]),
     )
@@ -0,0 +1,111 @@
+import bisect
+import heapq
+import unicodedata
+from collections import defaultdict
+from typing import Iterable
+
+FUZZY_THRESHOLD = 0.5
+"""Minimum fraction of the query trigrams contained in a name for a typo-tolerant match"""
+
+
+def normalize(text: str) -> str:
+    """Normalize a name for searching: case folded, accents removed, punctuation replaced by spaces"""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    chars = [c if c.isalnum() else " " for c in text if not unicodedata.combining(c)]
+    return " ".join("".join(chars).split())
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Prebuilt index of item names for autocomplete.
+
+    Matches are ranked by tier, then by score, then by shorter names, then alphabetically:
+    1. the whole name equals the query
+    2. the name starts with the query
+    3. a word of the name starts with the query
+    4. the name contains the query
+    5. the name contains most of the trigrams of the query (typo tolerance), more trigrams first
+
+    Example:
+    ```
+    index = SearchIndex(item.name for item in db.weapons.list)
+    names = index.search("amos", limit=25)
+    ```
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: list[str] = list(dict.fromkeys(names))
+        """Original names, without duplicates"""
+        self._normalized: list[str] = [normalize(name) for name in self.names]
+        # Position of each name when sorted by (length, name), used to break ties
+        self._order: list[int] = [0] * len(self.names)
+        by_length = sorted(range(len(self.names)), key=lambda i: (len(self.names[i]), self.names[i]))
+        for position, i in enumerate(by_length):
+            self._order[i] = position
+
+        # (normalized name starting from a word, index of the name), sorted for prefix search
+        prefixes: list[tuple[str, int]] = []
+        postings: defaultdict[str, list[int]] = defaultdict(list)
+        for i, text in enumerate(self._normalized):
+            prefixes.append((text, i))
+            prefixes.extend((text[p + 1 :], i) for p, c in enumerate(text) if c == " ")
+            for trigram in _trigrams(text):
+                postings[trigram].append(i)
+        prefixes.sort()
+        self._prefixes = prefixes
+        self._postings: dict[str, list[int]] = dict(postings)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = 25) -> list[str]:
+        """Return at most `limit` names matching the query, best matches first"""
+        query = normalize(query)
+        if query == "":
+            return self.names[:limit]
+
+        # index of the name -> (tier, negative score, order)
+        matches: dict[int, tuple[int, float, int]] = {}
+
+        def add(i: int, tier: int, score: float = 0.0) -> None:
+            rank = (tier, -score, self._order[i])
+            if i not in matches or rank < matches[i]:
+                matches[i] = rank
+
+        position = bisect.bisect_left(self._prefixes, (query,))
+        while position < len(self._prefixes):
+            text, i = self._prefixes[position]
+            if not text.startswith(query):
+                break
+            position += 1
+            normalized = self._normalized[i]
+            add(i, 0 if normalized == query else (1 if len(text) == len(normalized) else 2))
+
+        query_trigrams = _trigrams(query)
+        if len(query) >= 3:
+            # Every name containing the query contains all the inner trigrams of the query
+            inner = [query[i : i + 3] for i in range(len(query) - 2)]
+            candidates: Iterable[int] = min((self._postings.get(t, []) for t in inner), key=len)
+        else:
+            # Too short to have an inner trigram, the names are few enough to scan
+            candidates = range(len(self._normalized))
+        for i in candidates:
+            if i not in matches and query in self._normalized[i]:
+                add(i, 3)
+
+        if len(matches) < limit:
+            common: defaultdict[int, int] = defaultdict(int)
+            for trigram in query_trigrams:
+                for i in self._postings.get(trigram, []):
+                    common[i] += 1
+            for i, count in common.items():
+                score = count / len(query_trigrams)
+                if i not in matches and score >= FUZZY_THRESHOLD:
+                    add(i, 4, score)
+
+        best = heapq.nsmallest(limit, matches.items(), key=lambda item: item[1])
+        return [self.names[i] for i, _ in best]
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import time
+import zlib
+from pathlib import Path
+from typing import ClassVar
+
+import sentry_sdk
+
+from utility import LOG
+
+from .models import GenshinDbAllData
+from .parsers import clear_embed_cache
+from .request import fetch_raw, parse_all
+
+SNAPSHOT_VERSION = 2
+"""Bump this when the models change, old snapshots are then ignored and fetched again"""
+
+_MAGIC = b"GDBS"
+_DIGEST_SIZE = 16
+_HEADER_SIZE = len(_MAGIC) + 2 + _DIGEST_SIZE
+
+
+def raw_digest(raw: dict) -> bytes:
+    """Digest of the raw data returned by `fetch_raw`, used to tell whether the data changed"""
+    payload = json.dumps(raw, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(payload, digest_size=_DIGEST_SIZE).digest()
+
+
+def dump_snapshot(digest: bytes, data: GenshinDbAllData) -> bytes:
+    """Serialize the data into a snapshot
+
+    Snapshot format: magic (4 bytes) | version (2 bytes) | digest of the raw data (16 bytes) | zlib compressed pickle
+    """
+    header = _MAGIC + SNAPSHOT_VERSION.to_bytes(2, "little") + digest
+    return header + zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_snapshot(snapshot: bytes) -> tuple[bytes, GenshinDbAllData] | None:
+    """Deserialize the snapshot, return (digest of the raw data, data),
+    or `None` if the snapshot is broken or made by another version"""
+    if len(snapshot) < _HEADER_SIZE or snapshot[: len(_MAGIC)] != _MAGIC:
+        return None
+    version = int.from_bytes(snapshot[len(_MAGIC) : len(_MAGIC) + 2], "little")
+    if version != SNAPSHOT_VERSION:
+        return None
+    digest = snapshot[len(_MAGIC) + 2 : _HEADER_SIZE]
+    try:
+        # zlib verifies the checksum of the compressed data
+        data = pickle.loads(zlib.decompress(snapshot[_HEADER_SIZE:]))
+    except Exception:
+        return None
+    return (digest, data) if isinstance(data, GenshinDbAllData) else None
+
+
+class GenshinDb:
+    """Holder of the genshin-db data used by the search commands.
+
+    When the bot starts, `load` reads the data from the snapshot on disk, then `refresh` fetches the data
+    from the genshin-db API in the background. `data` is replaced as a whole only when the fetched data
+    is different from the current one, so readers always see a complete data set.
+
+    Example:
+    ```
+    await GenshinDb.load()
+    asyncio.create_task(GenshinDb.refresh())
+    character = GenshinDb.data.characters.find("Nahida") if GenshinDb.data else None
+    ```
+    """
+
+    path: ClassVar[Path] = Path("data/cache/genshin_db.snapshot")
+
+    data: ClassVar[GenshinDbAllData | None] = None
+    """Current data, `None` before the data is loaded"""
+    digest: ClassVar[bytes] = b""
+    """Digest of the raw data of the current data"""
+
+    _refresh_lock: ClassVar[asyncio.Lock | None] = None
+
+    @classmethod
+    async def load(cls) -> bool:
+        """Load the data from the snapshot on disk, return whether the snapshot is loaded"""
+        start_time = time.perf_counter()
+        try:
+            snapshot = await asyncio.to_thread(cls.path.read_bytes)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            LOG.Error(f"Failed to read the genshin-db snapshot: {e}")
+            return False
+
+        result = await asyncio.to_thread(load_snapshot, snapshot)
+        if result is None:
+            LOG.System("The genshin-db snapshot is outdated or broken, waiting for the data from the API")
+            return False
+        cls.digest, cls.data = result
+        clear_embed_cache()
+        LOG.System(f"Loaded the genshin-db snapshot in {(time.perf_counter() - start_time) * 1000:.0f} ms")
+        return True
+
+    @classmethod
+    async def refresh(cls) -> bool:
+        """Fetch the data from the genshin-db API, replace the current data and save the snapshot
+        if the data changed. Return whether the data changed; errors are logged instead of raised."""
+        if cls._refresh_lock is None:
+            cls._refresh_lock = asyncio.Lock()
+        async with cls._refresh_lock:
+            start_time = time.perf_counter()
+            try:
+                raw = await fetch_raw()
+                digest = await asyncio.to_thread(raw_digest, raw)
+                if digest == cls.digest:
+                    elapsed = time.perf_counter() - start_time
+                    LOG.System(f"Fetched the genshin-db data in {elapsed:.1f} seconds, no changes")
+                    return False
+                data = await asyncio.to_thread(parse_all, raw)
+                snapshot = await asyncio.to_thread(dump_snapshot, digest, data)
+            except Exception as e:
+                LOG.Error(f"Failed to fetch the genshin-db data: {e}")
+                sentry_sdk.capture_exception(e)
+                return False
+
+            elapsed = time.perf_counter() - start_time
+            cls.digest, cls.data = digest, data
+            clear_embed_cache()
+            LOG.System(f"Fetched the genshin-db data in {elapsed:.1f} seconds, data updated")
+
+            try:
+                await asyncio.to_thread(cls._write_snapshot, snapshot)
+            except OSError as e:
+                LOG.Error(f"Failed to write the genshin-db snapshot: {e}")
+            return True
+
+    @classmethod
+    def _write_snapshot(cls, snapshot: bytes) -> None:
+        cls.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cls.path.with_suffix(".tmp")
+        tmp_path.write_bytes(snapshot)
+        os.replace(tmp_path, cls.path)
@@ -1,15 +1,15 @@
 import asyncio
+import math
 from datetime import datetime
 from typing import Any, ClassVar, Final
 
-import aiohttp
 import discord
 import sentry_sdk
 from discord.ext import commands
 
 import database
-from database import Database, GeetestChallenge, ScheduleDailyCheckin, User
-from utility import LOG, EmbedTemplate, config
+from database import BatchWriter, Database, GeetestChallenge, ScheduleDailyCheckin
+from utility import LOG, EmbedTemplate, HttpSession, TokenBucket, config
 
 from .. import claim_daily_reward
 
@@ -20,6 +20,8 @@ class DailyReward:
     _honkai_count: ClassVar[dict[str, int]] = {}
     _starrail_count: ClassVar[dict[str, int]] = {}
     _themis_count: ClassVar[dict[str, int]] = {}
+    _api_error_count: ClassVar[dict[str, int]] = {}
+    _writer: ClassVar[BatchWriter]
 
     @classmethod
     async def execute(cls, bot: commands.Bot):
@@ -39,13 +41,20 @@ class DailyReward:
                 if user.next_checkin_time < datetime.now():
                     await queue.put(user)
 
-            tasks = [asyncio.create_task(cls._claim_daily_reward_task(queue, "LOCAL", bot))]
-            for host in config.daily_reward_api_list:
-                tasks.append(asyncio.create_task(cls._claim_daily_reward_task(queue, host, bot)))
+            cls._writer = BatchWriter(
+                "daily_checkin",
+                batch_size=config.schedule_db_batch_size,
+                flush_interval=config.schedule_db_batch_interval,
+            )
+            async with cls._writer:
+                tasks = [
+                    asyncio.create_task(cls._claim_daily_reward_host(queue, host, bot))
+                    for host in ["LOCAL", *config.daily_reward_api_list]
+                ]
 
-            await queue.join()
-            for task in tasks:
-                task.cancel()
+                await queue.join()
+                for task in tasks:
+                    task.cancel()
 
             _log_message = (
                 f"Automatic sign-in completed: {sum(cls._total.values())} people signed in, "
@@ -53,6 +62,7 @@ class DailyReward:
             )
             for host in cls._total.keys():
                 _log_message += f"- {host}：{cls._total.get(host)}、{cls._honkai_count.get(host)}、{cls._starrail_count.get(host)}\n"
+            _log_message += f"Database: {cls._writer.summary()}"
             LOG.System(_log_message)
         except Exception as e:
             sentry_sdk.capture_exception(e)
@@ -61,54 +71,80 @@ class DailyReward:
             cls._lock.release()
 
     @classmethod
-    async def _claim_daily_reward_task(
+    async def _claim_daily_reward_host(
         cls, queue: asyncio.Queue[ScheduleDailyCheckin], host: str, bot: commands.Bot
     ):
+        """Test the host, then start the workers of this host sharing one rate budget"""
         LOG.Info(f"Automatic scheduling for sign-in tasks started: {host}")
         if host != "LOCAL":
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.get(host) as resp:
-                        if resp.status != 200:
-                            raise Exception(f"HTTP status code {resp.status}")
-                except Exception as e:
-                    sentry_sdk.capture_exception(e)
-                    LOG.Error(f"Error occurred during testing API {host} for DailyReward automatic scheduling: {e}")
-                    return
+            try:
+                async with HttpSession.get().get(host) as resp:
+                    if resp.status != 200:
+                        raise Exception(f"HTTP status code {resp.status}")
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+                LOG.Error(f"Error occurred during testing API {host} for DailyReward automatic scheduling: {e}")
+                return
 
         cls._total[host] = 0
         cls._honkai_count[host] = 0
         cls._starrail_count[host] = 0
         cls._themis_count[host] = 0
+        cls._api_error_count[host] = 0
+
+        rate_limiter = TokenBucket(config.daily_reward_rate_per_host, config.daily_reward_rate_burst)
+        workers = max(1, config.daily_reward_workers_per_host)
+        await asyncio.gather(
+            *[
+                cls._claim_daily_reward_task(queue, host, bot, rate_limiter, i, workers)
+                for i in range(workers)
+            ]
+        )
+
+    @classmethod
+    async def _claim_daily_reward_task(
+        cls,
+        queue: asyncio.Queue[ScheduleDailyCheckin],
+        host: str,
+        bot: commands.Bot,
+        rate_limiter: TokenBucket,
+        index: int,
+        workers: int,
+    ):
         MAX_API_ERROR_COUNT: Final[int] = 20
-        api_error_count = 0
 
         while True:
+            # When the host is rate limited, park the extra workers until the rate recovers
+            while index >= max(1, math.ceil(workers * rate_limiter.load_factor)):
+                await asyncio.sleep(1)
+
             user = await queue.get()
             try:
-                message = await cls._claim_daily_reward(host, user)
+                message = await cls._claim_daily_reward(host, user, rate_limiter)
             except Exception as e:
                 await queue.put(user)
-                api_error_count += 1
+                cls._api_error_count[host] += 1
+                api_error_count = cls._api_error_count[host]
                 LOG.Error(f"Remote API: Error occurred at {host} ({api_error_count}/{MAX_API_ERROR_COUNT})")
                 if api_error_count >= MAX_API_ERROR_COUNT:
                     sentry_sdk.capture_exception(e)
                     return
             else:
                 user.update_next_checkin_time()
-                await Database.insert_or_replace(user)
+                await cls._writer.add(user)
                 if message is not None:
                     await cls._send_message(bot, user, message)
                     cls._total[host] += 1
                     cls._honkai_count[host] += int(user.has_honkai3rd)
                     cls._starrail_count[host] += int(user.has_starrail)
                     cls._themis_count[host] += int(user.has_themis) + int(user.has_themis_tw)
-                    await asyncio.sleep(config.schedule_loop_delay)
             finally:
                 queue.task_done()
 
     @classmethod
-    async def _claim_daily_reward(cls, host: str, user: ScheduleDailyCheckin) -> str | None:
+    async def _claim_daily_reward(
+        cls, host: str, user: ScheduleDailyCheckin, rate_limiter: TokenBucket
+    ) -> str | None:
         if host == "LOCAL":
             message = await claim_daily_reward(
                 user.discord_id,
@@ -117,10 +153,11 @@ class DailyReward:
                 has_starrail=user.has_starrail,
                 has_themis=user.has_themis,
                 has_themis_tw=user.has_themis_tw,
+                rate_limiter=rate_limiter,
             )
             return message
         else:
-            user_data = await Database.select_one(User, User.discord_id.is_(user.discord_id))
+            user_data = await Database.select_user(user.discord_id)
             gt_challenge = await Database.select_one(
                 GeetestChallenge, GeetestChallenge.discord_id.is_(user.discord_id)
             )
@@ -151,14 +188,17 @@ class DailyReward:
                         "geetest_starrail": gt_challenge.starrail,
                     }
                 )
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url=host + "/daily-reward", json=payload) as resp:
-                    if resp.status == 200:
-                        result: dict[str, str] = await resp.json()
-                        message = result.get("message", "Remote API sign-in failed")
-                        return message
-                    else:
-                        raise Exception(f"Sign-in failed for {host}, HTTP status code: {resp.status}")
+            await rate_limiter.acquire()
+            async with HttpSession.get().post(url=host + "/daily-reward", json=payload) as resp:
+                if resp.status == 200:
+                    rate_limiter.reward()
+                    result: dict[str, str] = await resp.json()
+                    message = result.get("message", "Remote API sign-in failed")
+                    return message
+                else:
+                    if resp.status == 429:
+                        rate_limiter.penalize()
+                    raise Exception(f"Sign-in failed for {host}, HTTP status code: {resp.status}")
 
     @classmethod
     async def _send_message(cls, bot: commands.Bot, user: ScheduleDailyCheckin, message: str):
@@ -176,6 +216,6 @@ class DailyReward:
             discord.InvalidData,
         ) as e:
             LOG.Except(f"Failed to send message during automatic sign-in. Remove this user {LOG.User(user.discord_id)}: {e}")
-            await Database.delete_instance(user)
+            await cls._writer.delete(user)
         except Exception as e:
             sentry_sdk.capture_exception(e)
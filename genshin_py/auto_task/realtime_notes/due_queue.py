@@ -0,0 +1,66 @@
+import heapq
+from datetime import datetime
+
+
+class DueQueue:
+    """In-memory schedule of users ordered by their next check time (min-heap).
+
+    Each user has at most one valid entry; rescheduling or removing a user leaves the old heap entry
+    in place, and it is skipped when it reaches the top of the heap (lazy deletion).
+    """
+
+    def __init__(self) -> None:
+        self.loaded: bool = False
+        """Whether the queue has been loaded from the database"""
+        self._heap: list[tuple[datetime, int]] = []
+        self._due_time: dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._due_time)
+
+    def __contains__(self, discord_id: int) -> bool:
+        return discord_id in self._due_time
+
+    def push(self, discord_id: int, due_time: datetime | None) -> None:
+        """Schedule the user at `due_time`, replacing the previous schedule of this user.
+        `None` means the user is due immediately.
+        """
+        due_time = due_time or datetime.min
+        self._due_time[discord_id] = due_time
+        heapq.heappush(self._heap, (due_time, discord_id))
+        # Rebuild the heap when stale entries take up most of it
+        if len(self._heap) > 2 * len(self._due_time) + 64:
+            self._heap = [(t, _id) for _id, t in self._due_time.items()]
+            heapq.heapify(self._heap)
+
+    def remove(self, discord_id: int) -> None:
+        """Remove the user from the queue"""
+        self._due_time.pop(discord_id, None)
+
+    def clear(self) -> None:
+        """Remove all users and mark the queue as not loaded"""
+        self._heap.clear()
+        self._due_time.clear()
+        self.loaded = False
+
+    def next_due_time(self) -> datetime | None:
+        """Return the earliest due time in the queue, or `None` if the queue is empty"""
+        self._discard_stale()
+        return self._heap[0][0] if len(self._heap) > 0 else None
+
+    def pop_due(self, now: datetime, limit: int | None = None) -> list[int]:
+        """Remove and return the IDs of users that are due at `now`, in order of due time"""
+        user_ids: list[int] = []
+        while limit is None or len(user_ids) < limit:
+            self._discard_stale()
+            if len(self._heap) == 0 or self._heap[0][0] > now:
+                break
+            _, discord_id = heapq.heappop(self._heap)
+            del self._due_time[discord_id]
+            user_ids.append(discord_id)
+        return user_ids
+
+    def _discard_stale(self) -> None:
+        heap = self._heap
+        while len(heap) > 0 and self._due_time.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
@@ -1,5 +1,7 @@
 import asyncio
-from datetime import datetime
+import statistics
+import time
+from datetime import datetime, timedelta
 from typing import Awaitable, Callable, ClassVar
 
 import discord
@@ -8,9 +10,11 @@ import sqlalchemy
 from discord.ext import commands
 
 from database import Database, GenshinScheduleNotes, StarrailScheduleNotes
-from utility import LOG, config
+from utility import LOG, TokenBucket, config
+from utility.prometheus import Metrics
 
 from .common import CheckResult, T_User
+from .due_queue import DueQueue
 from .genshin import check_genshin_notes
 from .starrail import check_starrail_notes
 
@@ -19,6 +23,15 @@ class RealtimeNotes:
 
     _lock: ClassVar[asyncio.Lock] = asyncio.Lock()
     _bot: commands.Bot
+    _queues: ClassVar[dict[type, DueQueue]] = {
+        GenshinScheduleNotes: DueQueue(),
+        StarrailScheduleNotes: DueQueue(),
+    }
+    """Users of each game table ordered by next check time"""
+    _timer: ClassVar[asyncio.TimerHandle | None] = None
+    """Timer that wakes the check when the next user is due"""
+    _rate_limiter: ClassVar[TokenBucket] = TokenBucket(config.schedule_notes_rate, config.schedule_notes_rate_burst)
+    """Request rate budget shared by the checks of all games"""
 
     @classmethod
     async def execute(cls, bot: commands.Bot):
@@ -27,7 +40,6 @@ class RealtimeNotes:
         await cls._lock.acquire()
         cls._bot = bot
         try:
-            LOG.System("Automatically check the resins")
             await asyncio.gather(
                 cls._check_games_note(GenshinScheduleNotes, "Genshin Impact", check_genshin_notes),
                 cls._check_games_note(StarrailScheduleNotes, "Star Rail", check_starrail_notes),
@@ -37,6 +49,52 @@ class RealtimeNotes:
             LOG.Error(f"Automatic scheduling of RealtimeNotes encountered an error: {e}")
         finally:
             cls._lock.release()
+            cls._arm_timer()
+
+    @classmethod
+    def schedule(cls, game_orm: type[T_User], discord_id: int, next_check_time: datetime | None = None) -> None:
+        """Add or reschedule a user after the settings are changed, `None` means checking as soon as possible"""
+        queue = cls._queues[game_orm]
+        if queue.loaded:
+            queue.push(discord_id, next_check_time)
+            cls._arm_timer()
+
+    @classmethod
+    async def _load_queue(cls, game_orm: type[T_User]) -> None:
+        """Load the next check time of all users from the database, only done once after the bot starts"""
+        queue = cls._queues[game_orm]
+        queue.loaded = True
+        stmt = sqlalchemy.select(game_orm.discord_id, game_orm.next_check_time)
+        async with Database.sessionmaker() as session:
+            rows = (await session.execute(stmt)).all()
+        for discord_id, next_check_time in rows:
+            if discord_id not in queue:
+                queue.push(discord_id, next_check_time)
+
+    @classmethod
+    def _arm_timer(cls) -> None:
+        """Set the timer to the earliest next check time among all games"""
+        if cls._timer is not None:
+            cls._timer.cancel()
+            cls._timer = None
+        if not hasattr(cls, "_bot"):
+            return
+        due_times = [t for q in cls._queues.values() if (t := q.next_due_time()) is not None]
+        if len(due_times) == 0:
+            return
+        delay = max(0.0, (min(due_times) - datetime.now()).total_seconds())
+        cls._timer = asyncio.get_running_loop().call_later(delay, cls._on_timer)
+
+    @classmethod
+    def _on_timer(cls) -> None:
+        cls._timer = None
+        now = datetime.now()
+        # During the game maintenance, the schedule loop restarts the check after the maintenance ends
+        if config.game_maintenance_time is not None and (
+            config.game_maintenance_time[0] <= now < config.game_maintenance_time[1]
+        ):
+            return
+        asyncio.create_task(cls.execute(cls._bot))
 
     @classmethod
     async def _check_games_note(
@@ -45,21 +103,102 @@ class RealtimeNotes:
         game_name: str,
         game_check_fucntion: Callable[[T_User], Awaitable[CheckResult | None]],
     ) -> None:
+        queue = cls._queues[game_orm]
+        if not queue.loaded:
+            await cls._load_queue(game_orm)
+
         count = 0
-        stmt = sqlalchemy.select(game_orm.discord_id)
-        async with Database.sessionmaker() as session:
-            user_ids = (await session.execute(stmt)).scalars().all()
-        for user_id in user_ids:
-            user = await Database.select_one(game_orm, game_orm.discord_id.is_(user_id))
-            if user is None or user.next_check_time and datetime.now() < user.next_check_time:
-                continue
-            r = await game_check_fucntion(user)
-            if r is not None:
-                count += 1
-            if r and len(r.message) > 0:
-                await cls._send_message(user, r.message, r.embed)
-            await asyncio.sleep(config.schedule_loop_delay)
-        LOG.System(f"Automatic check for real-time notes in {game_name} completed. {count}/{len(user_ids)} users have been checked.") # noqa
+        latencies: list[float] = []
+
+        async def check_user(user: T_User) -> None:
+            nonlocal count
+            # Next check time pushed back to the queue, `None` until the check succeeds
+            next_check_time: datetime | None = None
+            try:
+                if user.next_check_time and datetime.now() < user.next_check_time:
+                    next_check_time = user.next_check_time
+                    queue.push(user.discord_id, next_check_time)
+                    return
+                await cls._rate_limiter.acquire()
+                start_time = time.perf_counter()
+                r = await game_check_fucntion(user)
+                elapsed = time.perf_counter() - start_time
+                latencies.append(elapsed)
+                Metrics.REALTIME_NOTES_CHECK_SECONDS.labels(game_name).observe(elapsed)
+                if r is not None:
+                    count += 1
+                # Do not check again before the next regular schedule if the check time is not updated
+                next_check_time = max(
+                    user.next_check_time or datetime.min,
+                    datetime.now() + timedelta(minutes=config.schedule_check_resin_interval),
+                )
+                queue.push(user.discord_id, next_check_time)
+                if r and len(r.message) > 0:
+                    await cls._send_message(user, r.message, r.embed)
+            except Exception as e:
+                LOG.Error(f"Failed to check the real-time notes of {LOG.User(user.discord_id)} in {game_name}: {e}")
+                raise
+            finally:
+                # Keep the user in the queue when the check failed, so it is retried at the next regular check
+                if next_check_time is None:
+                    queue.push(
+                        user.discord_id, datetime.now() + timedelta(minutes=config.schedule_check_resin_interval)
+                    )
+
+        total = 0
+        # A fixed number of workers check the users, fed continuously by the producer from the due-queue
+        worker_count = max(1, config.schedule_notes_concurrency)
+        pending: asyncio.Queue[T_User | None] = asyncio.Queue(maxsize=worker_count * 2)
+
+        async def produce() -> None:
+            nonlocal total
+            try:
+                while len(user_ids := queue.pop_due(datetime.now(), limit=100)) > 0:
+                    total += len(user_ids)
+                    try:
+                        users = await Database.select_all(game_orm, game_orm.discord_id.in_(user_ids))
+                    except Exception as e:
+                        # Put the popped users back, otherwise they would not be checked until the bot restarts
+                        retry_time = datetime.now() + timedelta(minutes=config.schedule_check_resin_interval)
+                        for user_id in user_ids:
+                            queue.push(user_id, retry_time)
+                        sentry_sdk.capture_exception(e)
+                        LOG.Error(f"Failed to load the users of the real-time notes check in {game_name}: {e}")
+                        return
+                    # Users not found in the database have been removed, so their entries are simply dropped
+                    for user in users:
+                        await pending.put(user)
+            finally:
+                for _ in range(worker_count):
+                    await pending.put(None)
+
+        async def work() -> None:
+            while (user := await pending.get()) is not None:
+                try:
+                    await check_user(user)
+                except Exception as e:
+                    sentry_sdk.capture_exception(e)
+
+        start_time = time.perf_counter()
+        await asyncio.gather(produce(), *[work() for _ in range(worker_count)])
+        wall_time = time.perf_counter() - start_time
+
+        if total > 0:
+            p50, p95 = cls._percentiles(latencies)
+            LOG.System(
+                f"Automatic check for real-time notes in {game_name} completed. {count}/{total} users have been checked. "
+                f"Time: {wall_time:.1f}s, per user p50 {p50:.2f}s, p95 {p95:.2f}s"
+            )
+
+    @staticmethod
+    def _percentiles(latencies: list[float]) -> tuple[float, float]:
+        """Return the (p50, p95) of the latencies"""
+        if len(latencies) == 0:
+            return (0.0, 0.0)
+        if len(latencies) == 1:
+            return (latencies[0], latencies[0])
+        q = statistics.quantiles(latencies, n=20, method="inclusive")
+        return (q[9], q[18])
 
     @classmethod
     async def _send_message(cls, user: T_User, message: str, embed: discord.Embed) -> None:
@@ -75,10 +214,12 @@ class RealtimeNotes:
             discord.InvalidData,
         ) as e:
             LOG.Except(f"Failed to send message during automatic check for real-time notes. Remove this user {LOG.User(user.discord_id)}: {e}") # noqa
+            cls._queues[type(user)].remove(user.discord_id)
             await Database.delete_instance(user)
         except Exception as e:
             sentry_sdk.capture_exception(e)
         else:
             if discord_user.mentioned_in(msg_sent) is False:
                 LOG.Except(f"The user is not in the channel during the automatic check for real-time notes. Remove this user {LOG.User(discord_user)}") # noqa
+                cls._queues[type(user)].remove(user.discord_id)
                 await Database.delete_instance(user)
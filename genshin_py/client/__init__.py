@@ -1,3 +1,4 @@
 from .common import *
 from .genshin import *
+from .pool import ClientPool
 from .starrail import *
@@ -6,10 +6,13 @@ import sentry_sdk
 
 import database
 from database import Database, GeetestChallenge, User
-from utility import LOG, config, get_app_command_mention
+from utility import LOG, TokenBucket, config, get_app_command_mention
 
 from ..errors import UserDataNotFound
 from ..errors_decorator import generalErrorHandler
+from .pool import ClientPool
+
+_GAMES_WITH_UID = (genshin.Game.GENSHIN, genshin.Game.HONKAI, genshin.Game.STARRAIL)
 
 
 async def get_client(
@@ -18,7 +21,12 @@ async def get_client(
     game: genshin.Game = genshin.Game.GENSHIN,
     check_uid=True,
 ) -> genshin.Client:
-    user = await Database.select_one(User, User.discord_id.is_(user_id))
+    client = ClientPool.get(user_id, game)
+    # A pooled client without UID still goes through the check below to get the error message
+    if client is not None and (check_uid is False or client.uid or game not in _GAMES_WITH_UID):
+        return client
+
+    user = await Database.select_user(user_id)
     check, msg = await database.Tool.check_user(user, check_uid=check_uid, game=game)
     if check is False or user is None:
         raise UserDataNotFound(msg)
@@ -51,6 +59,7 @@ async def get_client(
     client.set_cookies(cookie)
     client.default_game = game
     client.uid = uid
+    ClientPool.put(user_id, client)
     return client
 
 
@@ -79,7 +88,7 @@ async def set_cookie(user_id: int, cookie: str, games: Sequence[genshin.Game]) -
     hk3_accounts = [a for a in accounts if a.game == genshin.Game.HONKAI]
     sr_accounts = [a for a in accounts if a.game == genshin.Game.STARRAIL]
 
-    user = await Database.select_one(User, User.discord_id.is_(user_id))
+    user = await Database.select_user(user_id)
     if user is None:
         user = User(user_id)
 
@@ -110,6 +119,7 @@ async def set_cookie(user_id: int, cookie: str, games: Sequence[genshin.Game]) -
         user.cookie_themis = cookie
 
     await Database.insert_or_replace(user)
+    ClientPool.invalidate(user_id)
     LOG.Info(f"{LOG.User(user_id)} Cookie set successfully")
 
     result = "Cookie has been set successfully!"
@@ -145,6 +155,7 @@ async def claim_daily_reward(
     has_themis: bool = False,
     has_themis_tw: bool = False,
     is_geetest: bool = False,
+    rate_limiter: TokenBucket | None = None,
 ) -> str:
 
     try:
@@ -153,8 +164,12 @@ async def claim_daily_reward(
         return str(e)
 
     try:
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
         await client.check_in_community()
     except genshin.errors.GenshinException as e:
+        if isinstance(e, genshin.errors.VisitsTooFrequently) and rate_limiter is not None:
+            rate_limiter.penalize()
         if e.retcode != 2001:
             LOG.FuncExceptionLog(user_id, "claimDailyReward: Hoyolab", e)
     except Exception as e:
@@ -173,23 +188,27 @@ async def claim_daily_reward(
     if has_genshin:
         challenge = gt_challenge.genshin if gt_challenge else None
         client = await get_client(user_id, game=genshin.Game.GENSHIN, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.GENSHIN, is_geetest, challenge)
+        result += await _claim_reward(
+            user_id, client, genshin.Game.GENSHIN, is_geetest, challenge, rate_limiter
+        )
     if has_honkai3rd:
         challenge = gt_challenge.honkai3rd if gt_challenge else None
         client = await get_client(user_id, game=genshin.Game.HONKAI, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.HONKAI, is_geetest, challenge)
+        result += await _claim_reward(
+            user_id, client, genshin.Game.HONKAI, is_geetest, challenge, rate_limiter
+        )
     if has_starrail:
         challenge = gt_challenge.starrail if gt_challenge else None
         client = await get_client(user_id, game=genshin.Game.STARRAIL, check_uid=False)
         result += await _claim_reward(
-            user_id, client, genshin.Game.STARRAIL, is_geetest, challenge
+            user_id, client, genshin.Game.STARRAIL, is_geetest, challenge, rate_limiter
         )
     if has_themis:
         client = await get_client(user_id, game=genshin.Game.THEMIS, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.THEMIS)
+        result += await _claim_reward(user_id, client, genshin.Game.THEMIS, rate_limiter=rate_limiter)
     if has_themis_tw:
         client = await get_client(user_id, game=genshin.Game.THEMIS_TW, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.THEMIS_TW)
+        result += await _claim_reward(user_id, client, genshin.Game.THEMIS_TW, rate_limiter=rate_limiter)
 
     return result
 
@@ -200,6 +219,7 @@ async def _claim_reward(
     game: genshin.Game,
     is_geetest: bool = False,
     gt_challenge: Mapping[str, str] | None = None,
+    rate_limiter: TokenBucket | None = None,
     retry: int = 5,
 ) -> str:
     game_name = {
@@ -211,6 +231,8 @@ async def _claim_reward(
     }
 
     try:
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
         reward = await client.claim_daily_reward(game=game, challenge=gt_challenge)
     except genshin.errors.AlreadyClaimed:
         return f"{game_name[game]} daily rewards have already been claimed today!"
@@ -236,14 +258,20 @@ async def _claim_reward(
             return f"{game_name[game]} sign-in failed. No character data found for the currently logged-in account."
         if isinstance(e, genshin.errors.GenshinException) and e.retcode == 50000:
             return f"{game_name[game]} request failed. Please try again later."
+        if isinstance(e, genshin.errors.VisitsTooFrequently) and rate_limiter is not None:
+            rate_limiter.penalize()
 
         LOG.FuncExceptionLog(user_id, "claimDailyReward", e)
         if retry > 0:
             await asyncio.sleep(1)
-            return await _claim_reward(user_id, client, game, is_geetest, gt_challenge, retry - 1)
+            return await _claim_reward(
+                user_id, client, game, is_geetest, gt_challenge, rate_limiter, retry - 1
+            )
 
         LOG.Error(f"{LOG.User(user_id)} {game_name[game]} sign-in failed")
         sentry_sdk.capture_exception(e)
         return f"{game_name[game]} sign-in failed: {e}."
     else:
+        if rate_limiter is not None:
+            rate_limiter.reward()
         return f"{game_name[game]} sign-in successful today! Received {reward.amount}x {reward.name}!"
@@ -0,0 +1,55 @@
+import functools
+from typing import ClassVar
+
+import genshin
+from cachetools import TTLCache
+
+from utility import HttpSession, config
+
+
+class ClientPool:
+    """Pool of `genshin.Client` keyed by (discord_id, game, region), so that repeated API calls of the same user
+    reuse the client instead of reading the user data and creating a new client every time.
+
+    Clients are evicted after `config.genshin_client_pool_ttl` seconds or when the pool is full (LRU),
+    and all pooled clients send their requests through the connector of `HttpSession` to reuse the connections.
+    Call `invalidate` whenever the cookie or UID of the user changes.
+    """
+
+    _clients: ClassVar[TTLCache[tuple[int, genshin.Game, genshin.Region], genshin.Client]] = TTLCache(
+        maxsize=config.genshin_client_pool_size, ttl=config.genshin_client_pool_ttl
+    )
+
+    @classmethod
+    def get(cls, discord_id: int, game: genshin.Game) -> genshin.Client | None:
+        """Get the pooled client of the user for the game, return `None` if it is not in the pool"""
+        for region in (genshin.Region.OVERSEAS, genshin.Region.CHINESE):
+            client = cls._clients.get((discord_id, game, region))
+            if client is not None:
+                return client
+        return None
+
+    @classmethod
+    def put(cls, discord_id: int, client: genshin.Client) -> None:
+        """Add the client of the user to the pool, the client will use the shared connector afterwards"""
+        manager = client.cookie_manager
+        create_session = manager.create_session
+
+        # The connector is resolved for every new session, so a recreated shared session is picked up
+        @functools.wraps(create_session)
+        def create_shared_session(**kwargs):
+            return create_session(connector=HttpSession.connector(), connector_owner=False, **kwargs)
+
+        manager.create_session = create_shared_session  # type: ignore
+        cls._clients[(discord_id, client.default_game or genshin.Game.GENSHIN, client.region)] = client
+
+    @classmethod
+    def invalidate(cls, discord_id: int) -> None:
+        """Remove all pooled clients of the user"""
+        for key in [key for key in cls._clients.keys() if key[0] == discord_id]:
+            cls._clients.pop(key, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Remove all pooled clients"""
+        cls._clients.clear()
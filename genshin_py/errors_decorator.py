@@ -1,12 +1,11 @@
 import asyncio
-import datetime
 from typing import Callable
 
 import aiohttp
 import genshin
 import sentry_sdk
 
-from database import Database, User
+from database import LastUsedTracker
 from utility import LOG
 
 from .errors import GenshinAPIException, UserDataNotFound
@@ -24,12 +23,8 @@ def generalErrorHandler(func: Callable):
             for retry in range(RETRY_MAX, -1, -1):
                 try:
                     result = await func(*args, **kwargs)
-
-                    user = await Database.select_one(User, User.discord_id.is_(user_id))
-                    if user is not None:
-                        user.last_used_time = datetime.datetime.now()
-                        await Database.insert_or_replace(user)
-
+                    if user_id != -1:
+                        LastUsedTracker.touch(user_id)
                     return result
                 except (genshin.errors.InternalDatabaseError, aiohttp.ClientOSError) as e:
                     LOG.FuncExceptionLog(user_id, f"{func.__name__} (retry={retry})", e)
@@ -1,4 +1,14 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+
+from utility.fonts import load_font, preload_fonts
+
+FONT_SIZES: dict[str, list[int]] = {
+    "SourceHanSerifTC-Bold.otf": [88],
+    "SourceHanSansTC-Medium.otf": [40],
+    "SourceHanSansTC-Bold.otf": [30, 36, 38, 80, 85],
+    "SourceHanSansTC-Regular.otf": [24, 28, 30, 32, 35, 37, 40, 41],
+}
+"""Font sizes used by the painters, loaded in advance by `preload_painter_fonts`"""
 
 
 def draw_avatar(img: Image.Image, avatar: Image.Image, pos: tuple[int, int]):
@@ -18,5 +28,10 @@ def draw_text(
     anchor=None,
 ):
     draw = ImageDraw.Draw(img)
-    font = ImageFont.truetype(f"data/font/{font_name}", size)
+    font = load_font(f"data/font/{font_name}", size)
     draw.text(pos, text, fill, font, anchor=anchor)
+
+
+def preload_painter_fonts() -> None:
+    """Load all fonts used by the painters in advance"""
+    preload_fonts({f"data/font/{name}": sizes for name, sizes in FONT_SIZES.items()})
@@ -1,20 +1,24 @@
+import asyncio
 import random
 from io import BytesIO
 from pathlib import Path
 from typing import Sequence
 
-import aiohttp
 import enkanetwork
 import genshin
 from PIL import Image, ImageDraw
 
 from database.dataclass import spiral_abyss
-from utility import get_server_name
+from enka_network.utils import download_asset
+from utility import CardCache, ImageCache, RenderService, get_server_name
 
 from .common import draw_avatar, draw_text
 
 __all__ = ["draw_abyss_card", "draw_exploration_card", "draw_record_card"]
 
+ABYSS_TEMPLATE_VERSION = 1
+"""Version of the drawing of the abyss floor card, bump it when the card changes to invalidate `CardCache`"""
+
 
 def draw_rounded_rect(img: Image.Image, pos: tuple[float, float, float, float], **kwargs):
     transparent = Image.new("RGBA", img.size, 0)
@@ -26,8 +30,7 @@ def draw_rounded_rect(img: Image.Image, pos: tuple[float, float, float, float],
 def draw_basic_card(
     avatar_bytes: bytes, uid: int, user_stats: genshin.models.PartialGenshinUserStats
 ) -> Image.Image:
-    img: Image.Image = Image.open(f"data/image/record_card/{random.randint(1, 12)}.jpg")
-    img = img.convert("RGBA")
+    img = ImageCache.get(f"data/image/record_card/{random.randint(1, 12)}.jpg", "RGBA", copy=True)
 
     avatar: Image.Image = Image.open(BytesIO(avatar_bytes)).resize((250, 250))
     draw_avatar(img, avatar, (70, 210))
@@ -198,41 +201,36 @@ def draw_exploration_card(
     return fp
 
 
-async def draw_character(
+async def download_character_avatar(character: genshin.models.AbyssCharacter) -> None:
+    """Download the avatar of the character if it does not exist locally"""
+    avatar_file = Path(f"data/image/character/{character.id}.png")
+    if avatar_file.exists() is False:
+        urls: list[str] = []
+        try:
+            urls.append(enkanetwork.Assets.character(character.id).images.icon.url)  # type: ignore
+        except Exception:
+            pass
+        urls.append("https://api.ambr.top/assets/UI/" + character.icon.split("/")[-1])
+        for url in urls:
+            try:
+                await download_asset(str(avatar_file), url)
+            except Exception:
+                continue
+            else:
+                break
+
+
+def draw_character(
     img: Image.Image,
     character: genshin.models.AbyssCharacter,
     size: tuple[int, int],
     pos: tuple[int, int],
 ):
-    background = (
-        Image.open(f"data/image/character/char_{character.rarity}star_bg.png")
-        .convert("RGBA")
-        .resize(size)
-    )
+    background = ImageCache.get(f"data/image/character/char_{character.rarity}star_bg.png", "RGBA", size)
     avatar_file = Path(f"data/image/character/{character.id}.png")
     if avatar_file.exists() is False:
-        avatar_img: bytes | None = None
-        async with aiohttp.ClientSession() as session:
-            try:
-                enka_cdn = enkanetwork.Assets.character(character.id).images.icon.url  # type: ignore
-            except Exception:
-                pass
-            else:
-                async with session.get(enka_cdn) as resp:
-                    if resp.status == 200:
-                        avatar_img = await resp.read()
-            if avatar_img is None:
-                icon_name = character.icon.split("/")[-1]
-                ambr_url = "https://api.ambr.top/assets/UI/" + icon_name
-                async with session.get(ambr_url) as resp:
-                    if resp.status == 200:
-                        avatar_img = await resp.read()
-        if avatar_img is None:
-            return
-        else:
-            with open(avatar_file, "wb") as fp:
-                fp.write(avatar_img)
-    avatar = Image.open(avatar_file).convert("RGBA").resize((size[0], size[0]))
+        return
+    avatar = ImageCache.get(str(avatar_file), "RGBA", (size[0], size[0]))
     img.paste(background, pos, background)
     img.paste(avatar, pos, avatar)
 
@@ -240,7 +238,7 @@ async def draw_character(
 def draw_abyss_star(
     img: Image.Image, number: int, size: tuple[int, int], pos: tuple[float, float]
 ):
-    star = Image.open("data/image/spiral_abyss/star.png").convert("RGBA").resize(size)
+    star = ImageCache.get("data/image/spiral_abyss/star.png", "RGBA", size)
     pad = 5
     upper_left = (pos[0] - number / 2 * size[0] - (number - 1) * pad, pos[1] - size[1] / 2)
     for i in range(0, number):
@@ -251,8 +249,30 @@ async def draw_abyss_card(
     abyss_floor: genshin.models.Floor,
     characters: Sequence[spiral_abyss.CharacterData] | None = None,
 ) -> BytesIO:
-    img = Image.open("data/image/spiral_abyss/background_blur.jpg")
-    img = img.convert("RGBA")
+    async def render() -> BytesIO:
+        await asyncio.gather(
+            *[
+                download_character_avatar(character)
+                for chamber in abyss_floor.chambers
+                for battle in chamber.battles
+                for character in battle.characters
+            ]
+        )
+        return await RenderService.render(render_abyss_card, abyss_floor, characters)
+
+    # Only the constellations of the characters are drawn on the card
+    constellations = (
+        None if characters is None else sorted((c.id, c.constellation) for c in characters)
+    )
+    key = CardCache.make_key("abyss", ABYSS_TEMPLATE_VERSION, abyss_floor.json(), str(constellations))
+    return await CardCache.get_or_render(key, render)
+
+
+def render_abyss_card(
+    abyss_floor: genshin.models.Floor,
+    characters: Sequence[spiral_abyss.CharacterData] | None = None,
+) -> BytesIO:
+    img = ImageCache.get("data/image/spiral_abyss/background_blur.jpg", "RGBA", copy=True)
 
     character_size = (172, 210)
     character_pad = 8
@@ -280,7 +300,7 @@ async def draw_abyss_card(
             for k, character in enumerate(battle.characters):
                 x = left_upper[0] + k * (character_size[0] + 2 * character_pad)
                 y = left_upper[1]
-                await draw_character(img, character, (172, 210), (x, y))
+                draw_character(img, character, (172, 210), (x, y))
                 if characters is not None:
                     constellation = next(
                         (c.constellation for c in characters if c.id == character.id), 0
@@ -1,28 +1,32 @@
+import asyncio
 from io import BytesIO
 from pathlib import Path
 
-import aiohttp
 import genshin
 from PIL import Image
 
+from utility import HttpSession, ImageCache, RenderService
+
 from .common import draw_avatar, draw_text
 
 __all__ = ["draw_starrail_forgottenhall_card"]
 
+MAX_FLOOR_NUM = 3
 
-async def draw_character(character: genshin.models.FloorCharacter) -> Image.Image:
-    background = Image.open(f"data/image/character/hsr_{character.rarity}star_bg.png").convert(
-        "RGBA"
-    )
+
+async def download_character_avatar(character: genshin.models.FloorCharacter) -> None:
+    """Download the avatar of the character if it does not exist locally"""
     avatar_file = Path(f"data/image/character/{character.id}.png")
-    # Download avatar if not exists
     if avatar_file.exists() is False:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(character.icon) as response:
-                if response.status == 200:
-                    avatar_file.write_bytes(await response.read())
+        async with HttpSession.get().get(character.icon) as response:
+            if response.status == 200:
+                avatar_file.write_bytes(await response.read())
+
 
-    avatar = Image.open(avatar_file).convert("RGBA")
+def draw_character(character: genshin.models.FloorCharacter) -> Image.Image:
+    background = ImageCache.get(f"data/image/character/hsr_{character.rarity}star_bg.png", "RGBA", copy=True)
+    avatar_file = Path(f"data/image/character/{character.id}.png")
+    avatar = ImageCache.get(str(avatar_file), "RGBA")
     background.paste(avatar, (0, -8), avatar)
     draw_text(
         background,
@@ -36,7 +40,7 @@ async def draw_character(character: genshin.models.FloorCharacter) -> Image.Imag
     return background
 
 
-async def draw_floor(
+def draw_floor(
     floor: genshin.models.StarRailFloor | genshin.models.FictionFloor,
 ) -> Image.Image:
     # Create a transparent image
@@ -69,17 +73,17 @@ async def draw_floor(
     character_num = len(floor.node_1.avatars)
     x = int(357 - character_num / 2 * character_width - (character_num - 1) * pad)
     for i, character in enumerate(floor.node_1.avatars):
-        character_img = await draw_character(character)
+        character_img = draw_character(character)
         img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
 
     character_num = len(floor.node_2.avatars)
     x = int(1357 - character_num / 2 * character_width - (character_num - 1) * pad)
     for i, character in enumerate(floor.node_2.avatars):
-        character_img = await draw_character(character)
+        character_img = draw_character(character)
         img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
 
     # Draw star
-    star = Image.open("data/image/forgotten_hall/star.png").convert("RGBA")
+    star = ImageCache.get("data/image/forgotten_hall/star.png", "RGBA")
     number = floor.star_num
     pos: tuple[int, int] = (int(img.width / 2), 130)
     pos = (int(pos[0] - number / 2 * (star.width) - (number - 1) * 5), pos[1])
@@ -96,7 +100,26 @@ async def draw_starrail_forgottenhall_card(
     hall: genshin.models.StarRailChallenge | genshin.models.StarRailPureFiction,
     floors: list[genshin.models.StarRailFloor] | list[genshin.models.FictionFloor],
 ) -> BytesIO:
-    MAX_FLOOR_NUM = 3
+    floors = floors[:MAX_FLOOR_NUM]
+    await asyncio.gather(
+        *[
+            download_character_avatar(character)
+            for floor in floors
+            for character in [*floor.node_1.avatars, *floor.node_2.avatars]
+        ]
+    )
+    return await RenderService.render(
+        render_starrail_forgottenhall_card, avatar_bytes, nickname, uid, hall, floors
+    )
+
+
+def render_starrail_forgottenhall_card(
+    avatar_bytes: bytes,
+    nickname: str,
+    uid: int,
+    hall: genshin.models.StarRailChallenge | genshin.models.StarRailPureFiction,
+    floors: list[genshin.models.StarRailFloor] | list[genshin.models.FictionFloor],
+) -> BytesIO:
     floors = floors[:MAX_FLOOR_NUM]
     if isinstance(hall, genshin.models.StarRailChallenge):
         background_img_path = "data/image/forgotten_hall/bg.png"
@@ -105,7 +128,7 @@ async def draw_starrail_forgottenhall_card(
         background_img_path = "data/image/forgotten_hall/bg_blue.png"
         title = "Pure Fiction"
 
-    img = Image.open(background_img_path).convert("RGBA")
+    img = ImageCache.get(background_img_path, "RGBA", copy=True)
 
     avatar: Image.Image = Image.open(BytesIO(avatar_bytes)).resize((160, 160), Image.LANCZOS)
     draw_avatar(img, avatar, (230, 55))
@@ -158,7 +181,7 @@ async def draw_starrail_forgottenhall_card(
 
     floor_img_height = 0
     for i, floor in enumerate(floors):
-        floor_img = await draw_floor(floor)
+        floor_img = draw_floor(floor)
         w = floor_img.width
         h = floor_img.height
         floor_img = floor_img.resize((int(w * 0.85), int(h * 0.85)), Image.LANCZOS)
@@ -3,7 +3,7 @@ from typing import Sequence, Union, Tuple, List
 import discord
 import genshin
 
-from database import Database, User
+from database import Database
 from utility import emoji, get_day_of_week, get_server_name
 
 
@@ -201,7 +201,7 @@ async def parse_genshin_notes(
         embed.add_field(name=resin_title, value=(resin_msg + exped_title))
 
     if user is not None:
-        _u = await Database.select_one(User, User.discord_id.is_(user.id))
+        _u = await Database.select_user(user.id)
         uid = str(_u.uid_genshin if _u else "")
         embed.set_author(
             name=f"{get_server_name(uid[0])} {uid}",
@@ -298,7 +298,7 @@ async def parse_genshin_notes_command(
     main_embed.add_field(name=resin_title, value=(resin_msg))
 
     if user is not None:
-        _u = await Database.select_one(User, User.discord_id.is_(user.id))
+        _u = await Database.select_user(user.id)
         uid = str(_u.uid_genshin if _u else "")
         main_embed.set_author(
             name=f"{get_server_name(uid[0])} {uid}",
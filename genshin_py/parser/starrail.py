@@ -3,7 +3,7 @@ from datetime import datetime
 import discord
 import genshin
 
-from database import Database, User
+from database import Database
 from utility import get_day_of_week, get_server_name
 
 
@@ -63,7 +63,7 @@ async def parse_starrail_notes(
         embed.add_field(name=exped_title, value=exped_msg, inline=False)
 
     if user is not None:
-        _u = await Database.select_one(User, User.discord_id.is_(user.id))
+        _u = await Database.select_user(user.id)
         uid = str(_u.uid_starrail if _u else "")
         embed.set_author(
             name=f"Star Rail {get_server_name(uid[0])} {uid}",
@@ -1,5 +1,6 @@
 import argparse
 import asyncio
+import functools
 from pathlib import Path
 
 import discord
@@ -9,7 +10,14 @@ import sentry_sdk
 from discord.ext import commands
 
 import database
-from utility import LOG, config, sentry_logging
+import genshin_db
+import genshin_py
+from enka_network.enka_card import preload_card_backgrounds
+from enka_network.prefetch import prefetch_assets, update_enka_assets
+from enka_network.utils import preload_card_fonts
+from genshin_py.painter.common import preload_painter_fonts
+from star_rail.showcase import Showcase as StarrailShowcase
+from utility import LOG, HttpSession, RenderService, StartupPipeline, config, sentry_logging
 
 intents = discord.Intents.default()
 argparser = argparse.ArgumentParser()
@@ -23,37 +31,71 @@ class GenshinDiscordBot(commands.AutoShardedBot):
             intents=intents,
             application_id=config.application_id,
         )
+        self.refresh_task: asyncio.Task | None = None
 
     async def setup_hook(self) -> None:
-        await self.load_extension("jishaku")
-
-        await database.Database.init()
-
-        await genshin.utility.update_characters_ambr(["en-us"])
-
+        extensions: list[str] = []
         for filepath in Path("./cogs").glob("**/*cog.py"):
             parts = list(filepath.parts)
             parts[-1] = filepath.stem
-            await self.load_extension(".".join(parts))
-
+            extensions.append(".".join(parts))
         for filepath in Path("./cogs_external").glob("**/*.py"):
-            cog_name = Path(filepath).stem
-            await self.load_extension(f"cogs_external.{cog_name}")
+            extensions.append(f"cogs_external.{filepath.stem}")
+
+        # Independent stages run concurrently, network updates are left to `refresh_after_ready`
+        pipeline = StartupPipeline("boot")
+        pipeline.add("jishaku", lambda: self.load_extension("jishaku"))
+        pipeline.add("database", database.Database.init)
+        pipeline.add("http_session", HttpSession.init)
+        pipeline.add("render_service", self.start_render_service)
+        pipeline.add("prometheus", self.start_prometheus_server)
+        for extension in extensions:
+            pipeline.add(
+                extension,
+                functools.partial(self.load_extension, extension),
+                depends_on=["database", "http_session", "render_service"],
+            )
+        pipeline.add("tree_sync", self.sync_test_guild, depends_on=["jishaku", *extensions])
+        await pipeline.run()
+
+        self.refresh_task = asyncio.create_task(self.refresh_after_ready())
+
+    async def start_render_service(self) -> None:
+        RenderService.start([preload_card_fonts, preload_card_backgrounds, preload_painter_fonts])
+
+    async def start_prometheus_server(self) -> None:
+        if config.prometheus_server_port is not None:
+            prometheus_client.start_http_server(config.prometheus_server_port)
+            LOG.System(f"prometheus server: started on port {config.prometheus_server_port}")
 
+    async def sync_test_guild(self) -> None:
         if config.test_server_id is not None:
             test_guild = discord.Object(id=config.test_server_id)
             self.tree.copy_global_to(guild=test_guild)
             await self.tree.sync(guild=test_guild)
 
-        if config.prometheus_server_port is not None:
-            prometheus_client.start_http_server(config.prometheus_server_port)
-            LOG.System(f"prometheus server: started on port {config.prometheus_server_port}")
+    async def refresh_after_ready(self) -> None:
+        """Update the data that is served from the local cache during startup"""
+        await self.wait_until_ready()
+        pipeline = StartupPipeline("refresh")
+        pipeline.add("genshin_characters", lambda: genshin.utility.update_characters_ambr(["en-us"]), required=False)
+        pipeline.add("genshin_db", genshin_db.GenshinDb.refresh, required=False)
+        pipeline.add("enka_assets", update_enka_assets, required=False)
+        pipeline.add("enka_prefetch", prefetch_assets, depends_on=["enka_assets"], required=False)
+        await pipeline.run()
 
     async def on_ready(self):
         LOG.System(f"on_ready: You have logged in as {self.user}")
         LOG.System(f"on_ready: Total {len(self.guilds)} servers connected")
 
     async def close(self) -> None:
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+        RenderService.shutdown()
+        genshin_py.ClientPool.clear()
+        await StarrailShowcase.close_clients()
+        await HttpSession.close()
+        await database.LastUsedTracker.flush()
         await database.Database.close()
         LOG.System("on_close: The database has been closed")
         await super().close()
@@ -1,6 +1,8 @@
+import asyncio
+import contextlib
 import io
 import json
-from typing import Tuple
+from typing import AsyncIterator, ClassVar, Tuple
 
 import discord
 from cachetools import LRUCache
@@ -8,17 +10,36 @@ from honkairail.src.tools.modalV2 import StarRailApiDataV2
 from hsrcard.hsr import HonkaiCard
 from mihomo import MihomoAPI, StarrailInfoParsed
 from mihomo import tools as mihomo_tools
-from PIL.Image import Image
 
 from database import Database, StarrailShowcase
+from utility import LOG, CardCache, config
+
+TEMPLATE_VERSION = 1
+"""Version of the character card, bump it when hsrcard or the image format changes to invalidate `CardCache`"""
 
 
 class Showcase:
+    client: ClassVar[MihomoAPI] = MihomoAPI()
+    """Mihomo API client shared by every instance"""
+
+    _parsed_data: ClassVar[
+        LRUCache[int, tuple[bytes, StarrailInfoParsed, StarRailApiDataV2 | None]]
+    ] = LRUCache(config.showcase_cache_size)
+    """Parsed data shared by every instance,
+    key: UID, value: (digest of the database row, parsed data, data converted for HonkaiCard)"""
+
+    _card_creators: ClassVar[asyncio.Queue[HonkaiCard] | None] = None
+    """Idle HonkaiCard instances, each instance draws one card at a time"""
+    _card_creator_list: ClassVar[list[HonkaiCard]] = []
+    """Every HonkaiCard instance created, idle or borrowed, closed by `close_clients`"""
+    _card_creator_count: ClassVar[int] = 0
+    """Number of instances created or being created"""
+
     def __init__(self, uid: int) -> None:
         self.uid = uid
-        self.client = MihomoAPI()
         self.data: StarrailInfoParsed
-        self.image_cache: LRUCache[int, Image] = LRUCache(maxsize=10)
+        self.digest: bytes = b""
+        """Digest of the database row of `data`"""
         self.is_cached_data: bool = False
 
     async def load_data(self) -> None:
@@ -27,7 +48,8 @@ class Showcase:
         )
         cached_data: StarrailInfoParsed | None = None
         if srshowcase:
-            cached_data = srshowcase.data
+            cached_data = self._parse(srshowcase)
+            self.digest = srshowcase.digest
         try:
             new_data = await self.client.fetch_user(self.uid)
         except Exception as e:
@@ -40,7 +62,83 @@ class Showcase:
             if cached_data is not None:
                 new_data = mihomo_tools.merge_character_data(new_data, cached_data)
             self.data = mihomo_tools.remove_duplicate_character(new_data)
-            await Database.insert_or_replace(StarrailShowcase(self.uid, self.data))
+            srshowcase = StarrailShowcase(self.uid, self.data)
+            await Database.insert_or_replace(srshowcase)
+            self.digest = srshowcase.digest
+            self._parsed_data[self.uid] = (self.digest, self.data, None)
+
+    @classmethod
+    def invalidate(cls, uid: int) -> None:
+        """Remove the parsed data of the UID from the cache, call this after deleting the showcase of the UID"""
+        cls._parsed_data.pop(uid, None)
+
+    @classmethod
+    def _parse(cls, srshowcase: StarrailShowcase) -> StarrailInfoParsed:
+        """Decompress and parse the database row; a row that has not changed since it was last parsed
+        is served from the cache. The returned object is shared, do not modify it."""
+        digest = srshowcase.digest
+        cached = cls._parsed_data.get(srshowcase.uid)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        data = srshowcase.data
+        cls._parsed_data[srshowcase.uid] = (digest, data, None)
+        return data
+
+    def _get_hsrcard_data(self) -> StarRailApiDataV2:
+        """Convert `data` to the model used by HonkaiCard, the result is cached with the parsed data"""
+        cached = self._parsed_data.get(self.uid)
+        if cached is not None and cached[0] == self.digest and cached[2] is not None:
+            return cached[2]
+
+        data_dict = self.data.dict(by_alias=True)
+        data_dict["player"]["space_info"] = {}
+        data_hsrcard = StarRailApiDataV2.parse_raw(json.dumps(data_dict, ensure_ascii=False))
+        if cached is not None and cached[0] == self.digest:
+            self._parsed_data[self.uid] = (cached[0], cached[1], data_hsrcard)
+        return data_hsrcard
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def _card_creator(cls) -> AsyncIterator[HonkaiCard]:
+        """Borrow a long-lived HonkaiCard instance, at most `config.starrail_card_creators` instances are created"""
+        if cls._card_creators is None:
+            cls._card_creators = asyncio.Queue()
+        queue = cls._card_creators
+        try:
+            card_creator = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            if cls._card_creator_count < max(1, config.starrail_card_creators):
+                # Reserve the slot before awaiting, so concurrent calls do not create more instances than allowed
+                cls._card_creator_count += 1
+                try:
+                    card_creator = await HonkaiCard(lang="cht").__aenter__()
+                except BaseException:
+                    cls._card_creator_count -= 1
+                    raise
+                cls._card_creator_list.append(card_creator)
+            else:
+                try:
+                    card_creator = await asyncio.wait_for(queue.get(), config.render_queue_timeout)
+                except asyncio.TimeoutError:
+                    raise Exception("Too many images are being drawn at the moment, please try again later.")
+        try:
+            yield card_creator
+        finally:
+            queue.put_nowait(card_creator)
+
+    @classmethod
+    async def close_clients(cls) -> None:
+        """Close every HonkaiCard instance, including the borrowed ones, call this before the bot shuts down"""
+        card_creators = cls._card_creator_list
+        cls._card_creator_list = []
+        cls._card_creators = None
+        cls._card_creator_count = 0
+        for card_creator in card_creators:
+            try:
+                await card_creator.__aexit__(None, None, None)
+            except Exception as e:
+                LOG.Error(f"Failed to close HonkaiCard: {e}")
 
     def get_player_overview_embed(self) -> discord.Embed:
         player = self.data.player
@@ -74,26 +172,26 @@ class Showcase:
         embed = self.get_default_embed(index)
         embed.set_thumbnail(url=None)
 
-        if self.image_cache.get(index) is not None:
-            image = self.image_cache.get(index)
-        else:
-            data_dict = self.data.dict(by_alias=True)
-            data_dict["player"]["space_info"] = {}
-            data_hsrcard = StarRailApiDataV2.parse_raw(json.dumps(data_dict, ensure_ascii=False))
+        key = CardCache.make_key(
+            "starrail", TEMPLATE_VERSION, self.uid, index, self.data.json(by_alias=True), "cht"
+        )
+        fp = await CardCache.get_or_render(key, lambda: self._draw_character_card(index))
 
-            async with HonkaiCard(lang="cht") as card_creater:
-                result = await card_creater.creat(self.uid, data_hsrcard, index)
-                image = result.card[0].card
-            self.image_cache[index] = image
+        embed.set_image(url="attachment://image.jpeg")
+        file = discord.File(fp, "image.jpeg")
+        return (embed, file)
+
+    async def _draw_character_card(self, index: int) -> io.BytesIO:
+        data_hsrcard = self._get_hsrcard_data()
+        async with self._card_creator() as card_creater:
+            result = await card_creater.creat(self.uid, data_hsrcard, index)
+            image = result.card[0].card
 
         fp = io.BytesIO()
         image = image.convert("RGB")
         image.save(fp, "jpeg", optimize=True, quality=90)
         fp.seek(0)
-
-        embed.set_image(url="attachment://image.jpeg")
-        file = discord.File(fp, "image.jpeg")
-        return (embed, file)
+        return fp
 
     def get_character_stat_embed(self, index: int) -> discord.Embed:
         embed = self.get_default_embed(index)
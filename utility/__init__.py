@@ -1,5 +1,11 @@
+from .card_cache import CardCache
 from .config import config
 from .custom_log import LOG, ContextCommandLogger, SlashCommandLogger
 from .discord_ui_template import *
 from .emoji import emoji
+from .http_session import HttpSession
+from .image_cache import ImageCache
+from .rate_limiter import TokenBucket
+from .render_service import RenderService
+from .startup import StartupPipeline
 from .utils import *
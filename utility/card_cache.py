@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Awaitable, Callable, ClassVar
+
+from cachetools import LRUCache
+
+from .config import config
+from .custom_log import LOG
+from .prometheus import Metrics
+
+
+class CardCache:
+    """Global cache of rendered card images, keyed by the hash of the exact inputs of the card.
+
+    There are two tiers: an in-memory LRU bounded by `config.card_cache_memory_size` MB,
+    and files under `data/cache/cards/` bounded by `config.card_cache_disk_size` MB,
+    where the least recently used files are removed first.
+    The same input always produces the same image, so cached images never need to be invalidated;
+    when the drawing of a card changes, bump the template version passed to `make_key`.
+
+    Example:
+    ```
+    key = CardCache.make_key("abyss", TEMPLATE_VERSION, floor.json())
+    fp = await CardCache.get_or_render(key, lambda: render(floor))
+    ```
+    """
+
+    directory: ClassVar[Path] = Path("data/cache/cards")
+
+    _memory: ClassVar[LRUCache[str, bytes] | None] = None
+    _files: ClassVar[OrderedDict[str, int] | None] = None
+    """Files of the disk tier in least recently used order, key: cache key, value: file size"""
+    _files_size: ClassVar[int] = 0
+    _lock: ClassVar[asyncio.Lock | None] = None
+
+    @staticmethod
+    def make_key(namespace: str, template_version: int, *parts: str | bytes | int) -> str:
+        """Hash the inputs of a card into a cache key
+
+        Parameters
+        ------
+        namespace: `str`
+            Kind of the card, e.g., `enka`.
+        template_version: `int`
+            Version of the drawing of the card.
+        *parts: `str | bytes | int`
+            Everything that affects the image, e.g., the character data (JSON) and the language.
+        """
+        digest = hashlib.sha256(f"{namespace}:{template_version}".encode())
+        for part in parts:
+            data = part if isinstance(part, bytes) else str(part).encode()
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return f"{namespace}-{digest.hexdigest()}"
+
+    @classmethod
+    async def get(cls, key: str) -> BytesIO | None:
+        """Get the cached image, return `None` if it is not in the cache"""
+        memory = cls._get_memory()
+        if (data := memory.get(key)) is not None:
+            Metrics.CARD_CACHE_REQUESTS.labels("memory").inc()
+            return BytesIO(data)
+
+        async with cls._get_lock():
+            await cls._load_files()
+            assert cls._files is not None
+            if key in cls._files:
+                try:
+                    data = await asyncio.to_thread(cls._read_file, cls._path(key))
+                except OSError:
+                    cls._files_size -= cls._files.pop(key)
+                else:
+                    cls._files.move_to_end(key)
+                    memory[key] = data
+                    Metrics.CARD_CACHE_REQUESTS.labels("disk").inc()
+                    return BytesIO(data)
+
+        Metrics.CARD_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    @classmethod
+    async def put(cls, key: str, fp: BytesIO) -> None:
+        """Store the image in both tiers"""
+        data = fp.getvalue()
+        memory = cls._get_memory()
+        if len(data) <= memory.maxsize:
+            memory[key] = data
+
+        max_size = config.card_cache_disk_size * 1024 * 1024
+        if len(data) > max_size:
+            return
+        async with cls._get_lock():
+            await cls._load_files()
+            assert cls._files is not None
+            try:
+                await asyncio.to_thread(cls._write_file, cls._path(key), data)
+            except OSError as e:
+                LOG.Error(f"Failed to write the card cache file: {e}")
+                return
+            cls._files_size += len(data) - cls._files.pop(key, 0)
+            cls._files[key] = len(data)
+
+            evicted: list[Path] = []
+            while cls._files_size > max_size:
+                old_key, size = cls._files.popitem(last=False)
+                cls._files_size -= size
+                evicted.append(cls._path(old_key))
+            if len(evicted) > 0:
+                await asyncio.to_thread(cls._remove_files, evicted)
+
+    @classmethod
+    async def get_or_render(cls, key: str, render: Callable[[], Awaitable[BytesIO]]) -> BytesIO:
+        """Get the cached image, or render it with `render` and store it in the cache"""
+        if (fp := await cls.get(key)) is not None:
+            return fp
+        fp = await render()
+        await cls.put(key, fp)
+        fp.seek(0)
+        return fp
+
+    @classmethod
+    def _get_memory(cls) -> LRUCache[str, bytes]:
+        if cls._memory is None:
+            cls._memory = LRUCache(maxsize=config.card_cache_memory_size * 1024 * 1024, getsizeof=len)
+        return cls._memory
+
+    @classmethod
+    def _get_lock(cls) -> asyncio.Lock:
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        return cls._lock
+
+    @classmethod
+    def _path(cls, key: str) -> Path:
+        return cls.directory / f"{key}.bin"
+
+    @classmethod
+    async def _load_files(cls) -> None:
+        """Build the index of the disk tier from the existing files on first use"""
+        if cls._files is not None:
+            return
+        files = await asyncio.to_thread(cls._scan_files)
+        cls._files = OrderedDict((path.stem, stat.st_size) for path, stat in files)
+        cls._files_size = sum(cls._files.values())
+
+    @classmethod
+    def _scan_files(cls) -> list[tuple[Path, os.stat_result]]:
+        cls.directory.mkdir(parents=True, exist_ok=True)
+        files = [(path, path.stat()) for path in cls.directory.glob("*.bin")]
+        files.sort(key=lambda item: item[1].st_mtime)
+        return files
+
+    @staticmethod
+    def _read_file(path: Path) -> bytes:
+        data = path.read_bytes()
+        # Update the modification time, so the file order is still LRU after a restart
+        os.utime(path)
+        return data
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _remove_files(paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
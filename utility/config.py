@@ -14,16 +14,81 @@ class Config(BaseSettings):
     """Bot token, obtained from Discord Developer webpage"""
     enka_api_key: str | None = None
     """Send the key to the enka network API"""
+    enka_rate: float = 1.0
+    """Maximum number of requests per second sent to the enka network API"""
+    enka_rate_burst: int = 3
+    """Maximum number of requests sent to the enka network API at once"""
+    enka_prefetch_concurrency: int = 8
+    """Number of Enka assets downloaded at the same time when prefetching assets"""
+
+    http_connection_limit: int = 100
+    """Maximum number of connections of the shared HTTP session"""
+    http_connection_limit_per_host: int = 20
+    """Maximum number of connections to the same host of the shared HTTP session"""
+    http_keepalive_timeout: float = 30
+    """Time an idle connection of the shared HTTP session is kept alive (unit: second)"""
+    http_dns_cache_ttl: int = 300
+    """Time the DNS results of the shared HTTP session are cached (unit: second)"""
+    database_profile: str = "balanced"
+    """SQLite connection profile: default, balanced (WAL, synchronous=NORMAL) or durable (WAL, synchronous=FULL)"""
+    database_backup_pages: int = 256
+    """Number of database pages copied per step of the daily backup"""
+    database_backup_compress: bool = False
+    """Whether to compress the daily database backup with gzip"""
+    database_backup_keep: int = 0
+    """Number of latest days of database backups to keep, 0 means keeping all backups"""
+    render_workers: int = 2
+    """Number of processes rendering images, 0 means rendering in a thread of the bot process"""
+    render_queue_size: int = 16
+    """Maximum number of images being rendered or waiting to be rendered at the same time"""
+    render_queue_timeout: float = 10
+    """Maximum time an image waits for a free place in the render queue (unit: second)"""
+    render_timeout: float = 30
+    """Maximum time to render one image (unit: second)"""
+    render_background_jobs: int = 1
+    """Maximum number of low-priority render jobs (e.g., showcase pre-rendering) running at the same time"""
+    showcase_prerender: bool = False
+    """Whether to render the cards of all characters in the background after a showcase is opened"""
+    image_cache_size: int = 128
+    """Maximum memory of decoded images cached by each render process (unit: MB)"""
+    card_cache_memory_size: int = 64
+    """Maximum memory of rendered card images cached in memory (unit: MB)"""
+    card_cache_disk_size: int = 512
+    """Maximum size of rendered card images cached in data/cache/cards (unit: MB)"""
+    user_cache_size: int = 4096
+    """Maximum number of users kept in the in-memory user cache"""
+    showcase_cache_size: int = 256
+    """Maximum number of parsed showcase data kept in memory, for each game"""
+    starrail_card_creators: int = 2
+    """Number of Star Rail character cards (HonkaiCard) drawn at the same time"""
+    genshin_client_pool_size: int = 1024
+    """Maximum number of genshin.Client kept in the client pool"""
+    genshin_client_pool_ttl: float = 600
+    """Time a pooled genshin.Client is kept after it is created (unit: second)"""
 
     daily_reward_api_list: list[str] = []
     """The daily-checkin API url list"""
+    daily_reward_workers_per_host: int = 4
+    """Number of concurrent check-in workers for each daily-checkin host (including the local one)"""
+    daily_reward_rate_per_host: float = 2.0
+    """Maximum request rate to each daily-checkin host (unit: requests per second)"""
+    daily_reward_rate_burst: int = 4
+    """Maximum number of requests that can be sent at once to each daily-checkin host"""
 
     schedule_daily_checkin_interval: int = 10
     """The interval between automatic sign -in (unit: minute)"""
     schedule_check_resin_interval: int = 10
     """Automatically check the interval of resins (unit: minute)"""
-    schedule_loop_delay: float = 2.0
-    """The waiting interval between each user during scheduling (unit: second)"""
+    schedule_notes_concurrency: int = 8
+    """Maximum number of users checked at the same time in each real-time notes pass"""
+    schedule_notes_rate: float = 4.0
+    """Maximum request rate of real-time notes checks, shared by all games (unit: requests per second)"""
+    schedule_notes_rate_burst: int = 8
+    """Maximum number of real-time notes requests that can be sent at once"""
+    schedule_db_batch_size: int = 100
+    """Number of updated schedule rows buffered before they are written to the database in one transaction"""
+    schedule_db_batch_interval: float = 5.0
+    """Maximum time buffered schedule rows wait before being written to the database (unit: second)"""
     game_maintenance_time: tuple[datetime, datetime] | None = None
     """The maintenance time of the game (start, end), the automatic schedule will not be executed within this period"""
 
@@ -0,0 +1,35 @@
+import functools
+from typing import Iterable, Mapping
+
+from PIL import ImageFont
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Load the font file with the specified size, each (path, size) is only loaded once per process
+
+    Parameters
+    ------
+    path: `str`
+        Path of the font file, e.g., `data/font/SourceHanSansTC-Regular.otf`.
+    size: `int`
+        Font size.
+    """
+    return ImageFont.truetype(path, size)
+
+
+def preload_fonts(fonts: Mapping[str, Iterable[int]]) -> None:
+    """Load the fonts in advance, so the first image rendered does not pay for loading them.
+    Font files that do not exist are skipped.
+
+    Parameters
+    ------
+    fonts: `Mapping[str, Iterable[int]]`
+        Path of the font file and the font sizes to load, e.g., `{"data/font/xxx.otf": [24, 28]}`.
+    """
+    for path, sizes in fonts.items():
+        for size in sizes:
+            try:
+                load_font(path, size)
+            except OSError:
+                break
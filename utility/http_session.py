@@ -0,0 +1,92 @@
+import time
+from types import SimpleNamespace
+from typing import ClassVar
+
+import aiohttp
+
+from .config import config
+from .prometheus import Metrics
+
+
+class HttpSession:
+    """HTTP session shared by the whole bot, so that requests to the same host reuse the connections
+    (keep-alive) and the DNS results instead of creating a new session for every request.
+
+    The session is created in `GenshinDiscordBot.setup_hook` and closed in `GenshinDiscordBot.close`,
+    it is also created on first use if the bot has not created it yet.
+
+    Example:
+    ```
+    async with HttpSession.get().get(url) as resp:
+        data = await resp.read()
+    ```
+    """
+
+    _session: ClassVar[aiohttp.ClientSession | None] = None
+
+    @classmethod
+    async def init(cls) -> None:
+        """Create the shared session; call this once when the bot starts."""
+        cls.get()
+
+    @classmethod
+    def get(cls) -> aiohttp.ClientSession:
+        """Get the shared session, must be called inside a running event loop"""
+        if cls._session is None or cls._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.http_connection_limit,
+                limit_per_host=config.http_connection_limit_per_host,
+                ttl_dns_cache=config.http_dns_cache_ttl,
+                keepalive_timeout=config.http_keepalive_timeout,
+            )
+            cls._session = aiohttp.ClientSession(connector=connector, trace_configs=[cls._trace_config()])
+        return cls._session
+
+    @classmethod
+    def connector(cls) -> aiohttp.BaseConnector:
+        """Get the connector of the shared session, for other sessions that want to share the connection pool.
+        Those sessions must be created with `connector_owner=False`.
+        """
+        connector = cls.get().connector
+        assert connector is not None
+        return connector
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared session; call this once before the bot shuts down."""
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+
+    @staticmethod
+    def _trace_config() -> aiohttp.TraceConfig:
+        """Trace the requests of the shared session to export the connection pool metrics"""
+
+        async def on_request_start(session, ctx: SimpleNamespace, params: aiohttp.TraceRequestStartParams):
+            ctx.host = params.url.host or ""
+            Metrics.HTTP_REQUESTS_IN_FLIGHT.labels(ctx.host).inc()
+
+        async def on_request_finish(session, ctx: SimpleNamespace, params):
+            Metrics.HTTP_REQUESTS_IN_FLIGHT.labels(ctx.host).dec()
+
+        async def on_connection_queued_start(session, ctx: SimpleNamespace, params):
+            ctx.queued_time = time.perf_counter()
+
+        async def on_connection_queued_end(session, ctx: SimpleNamespace, params):
+            Metrics.HTTP_CONNECTION_QUEUED_SECONDS.observe(time.perf_counter() - ctx.queued_time)
+
+        async def on_connection_reuseconn(session, ctx: SimpleNamespace, params):
+            Metrics.HTTP_CONNECTIONS.labels("reused").inc()
+
+        async def on_connection_create_end(session, ctx: SimpleNamespace, params):
+            Metrics.HTTP_CONNECTIONS.labels("created").inc()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_finish)
+        trace_config.on_request_exception.append(on_request_finish)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import ClassVar
+
+from PIL import Image
+
+from .config import config
+
+_Key = tuple[str, str, tuple[int, int] | None, int]
+
+
+class ImageCache:
+    """In-memory LRU cache of decoded images, keyed by (path, mode, size, resample).
+
+    The cache is bounded by the total bytes of the pixels (`config.image_cache_size` MB),
+    the least recently used images are evicted first. Each render process has its own cache.
+
+    The returned image is shared by every caller, so it must be treated as read-only:
+    using it as the source of `paste`, `resize`, `crop`, etc. is fine,
+    call `.copy()` (or pass `copy=True`) before drawing on it.
+    """
+
+    _images: ClassVar[OrderedDict[_Key, Image.Image]] = OrderedDict()
+    _bytes: ClassVar[int] = 0
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def get(
+        cls,
+        path: str,
+        mode: str = "RGBA",
+        size: tuple[int, int] | None = None,
+        resample: int = Image.BICUBIC,
+        *,
+        copy: bool = False,
+    ) -> Image.Image:
+        """Get the decoded image, the file is only decoded and resized when it is not in the cache
+
+        Parameters
+        ------
+        path: `str`
+            Path of the image file.
+        mode: `str`
+            Mode the image is converted to.
+        size: `tuple[int, int] | None`
+            Size the image is resized to, `None` means keeping the original size.
+        resample: `int`
+            Resampling filter used by resizing.
+        copy: `bool`
+            Return a copy of the cached image, which can be modified by the caller.
+        """
+        key: _Key = (path, mode, size, resample)
+        with cls._lock:
+            image = cls._images.get(key)
+            if image is not None:
+                cls._images.move_to_end(key)
+        if image is None:
+            image = Image.open(path).convert(mode)
+            if size is not None and image.size != size:
+                image = image.resize(size, resample)
+            cls._put(key, image)
+        return image.copy() if copy else image
+
+    @classmethod
+    def clear(cls) -> None:
+        """Remove all images from the cache"""
+        with cls._lock:
+            cls._images.clear()
+            cls._bytes = 0
+
+    @classmethod
+    def _put(cls, key: _Key, image: Image.Image) -> None:
+        max_bytes = config.image_cache_size * 1024 * 1024
+        nbytes = cls._nbytes(image)
+        if nbytes > max_bytes:
+            return
+        with cls._lock:
+            if key in cls._images:
+                return
+            cls._images[key] = image
+            cls._bytes += nbytes
+            while cls._bytes > max_bytes:
+                _, evicted = cls._images.popitem(last=False)
+                cls._bytes -= cls._nbytes(evicted)
+
+    @staticmethod
+    def _nbytes(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
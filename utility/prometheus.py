@@ -1,6 +1,6 @@
 from typing import Final
 
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 
 class Metrics:
@@ -36,3 +36,59 @@ class Metrics:
     PROCESS_START_TIME: Final[Gauge] = Gauge(
         PREFIX + "process_start_time_seconds", "The current time when the bot started"
     )
+
+    DB_BATCH_FLUSH_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "db_batch_flush_seconds", "Time spent writing one batch of rows to the database", ["batch"]
+    )
+
+    DB_BATCH_FLUSH_ROWS: Final[Counter] = Counter(
+        PREFIX + "db_batch_flush_rows", "Number of rows written to the database by batch writers", ["batch"]
+    )
+
+    REALTIME_NOTES_CHECK_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "realtime_notes_check_seconds", "Time spent checking the real-time notes of one user", ["game"]
+    )
+
+    HTTP_REQUESTS_IN_FLIGHT: Final[Gauge] = Gauge(
+        PREFIX + "http_requests_in_flight", "Number of HTTP requests in progress on the shared session", ["host"]
+    )
+
+    HTTP_CONNECTIONS: Final[Counter] = Counter(
+        PREFIX + "http_connections", "Number of connections acquired by the shared session", ["type"]
+    )
+
+    HTTP_CONNECTION_QUEUED_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "http_connection_queued_seconds",
+        "Time a request of the shared session waits for a free connection when the pool is full",
+    )
+
+    USER_CACHE_REQUESTS: Final[Counter] = Counter(
+        PREFIX + "user_cache_requests", "Number of user lookups served by the in-memory user cache", ["result"]
+    )
+
+    RENDER_QUEUE_WAIT_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "render_queue_wait_seconds", "Time a render job waits before a worker starts it", ["job"]
+    )
+
+    RENDER_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "render_seconds", "Time a worker spends running a render job", ["job"]
+    )
+
+    RENDER_REJECTED: Final[Counter] = Counter(
+        PREFIX + "render_rejected", "Number of render jobs rejected because the render queue is full", ["job"]
+    )
+
+    CARD_CACHE_REQUESTS: Final[Counter] = Counter(
+        PREFIX + "card_cache_requests", "Number of rendered card lookups by the tier serving them", ["tier"]
+    )
+
+    SEARCH_AUTOCOMPLETE_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "search_autocomplete_seconds",
+        "Time spent ranking the autocomplete choices of the search command",
+        ["category"],
+        buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.1, 1.0),
+    )
+
+    STARTUP_STAGE_SECONDS: Final[Gauge] = Gauge(
+        PREFIX + "startup_stage_seconds", "Time spent on each stage of the last startup", ["pipeline", "stage"]
+    )
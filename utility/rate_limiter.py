@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token bucket rate limiter whose rate adapts to the server response.
+
+    Each `acquire` takes one token; tokens are refilled at `rate` per second up to `burst`.
+    When the server reports a rate limit, `penalize` halves the rate; every successful request
+    calls `reward`, which slowly raises the rate back to the configured maximum.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.max_rate: float = max(rate, 0.01)
+        """Configured rate (unit: requests per second)"""
+        self.min_rate: float = self.max_rate / 16
+        """Lowest rate that `penalize` can reduce to"""
+        self.rate: float = self.max_rate
+        """Current rate (unit: requests per second)"""
+        self.burst: int = max(1, burst)
+        """Maximum number of tokens that can be accumulated"""
+
+        self._tokens: float = float(self.burst)
+        self._updated_time: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def load_factor(self) -> float:
+        """Ratio of the current rate to the configured rate, between 0 and 1"""
+        return self.rate / self.max_rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it. Waiters are served in FIFO order."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def penalize(self) -> None:
+        """Halve the current rate and drop the accumulated tokens, called when the server reports a rate limit"""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds`, called when the server asks to retry after a while"""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def reward(self) -> None:
+        """Raise the current rate a little towards the configured rate, called after a successful request"""
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_time) * self.rate)
+        self._updated_time = now
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, ClassVar, Sequence, TypeVar
+
+from .config import config
+from .prometheus import Metrics
+
+T = TypeVar("T")
+
+
+def _init_worker(initializers: Sequence[Callable[[], None]]) -> None:
+    """Initializer of the render worker processes"""
+    # Let the main process handle Ctrl+C and shut down the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for initializer in initializers:
+        initializer()
+
+
+def _run_job(func: Callable[..., T], args: tuple, kwargs: dict[str, Any]) -> tuple[T, float, float]:
+    """Run the render job in the worker process, return (result, start time, elapsed time)"""
+    start_time = time.time()
+    perf_start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, start_time, time.perf_counter() - perf_start
+
+
+class RenderService:
+    """Run CPU-bound image rendering (PIL decode, composite, encode) in a process pool,
+    so that rendering cards does not block the event loop and scales across CPU cores.
+
+    A render job is a module-level sync function plus picklable arguments; the function must not do I/O
+    other than reading local files, so assets need to be downloaded before the job is submitted.
+    At most `config.render_queue_size` jobs are running or waiting at the same time, extra requests wait
+    for `config.render_queue_timeout` seconds before being rejected.
+
+    Example:
+    ```
+    fp = await RenderService.render(draw_record_card, avatar_bytes, uid, user_stats)
+    ```
+    """
+
+    _executor: ClassVar[ProcessPoolExecutor | None] = None
+    _semaphore: ClassVar[asyncio.Semaphore | None] = None
+    _background_semaphore: ClassVar[asyncio.Semaphore | None] = None
+    _foreground_jobs: ClassVar[int] = 0
+    """Number of jobs requested by `render` that are waiting or running"""
+    _idle: ClassVar[asyncio.Event | None] = None
+    """Set when `_foreground_jobs` is 0, background jobs wait for it"""
+
+    @classmethod
+    def start(cls, initializers: Sequence[Callable[[], None]] = ()) -> None:
+        """Start the worker processes; call this once when the bot starts.
+        If `config.render_workers` is 0, jobs are run in a thread of the bot process instead.
+
+        Parameters
+        ------
+        initializers: `Sequence[Callable[[], None]]`
+            Module-level functions run once in each worker, e.g., loading fonts in advance.
+        """
+        cls._semaphore = asyncio.Semaphore(max(1, config.render_queue_size))
+        if config.render_workers <= 0:
+            for initializer in initializers:
+                initializer()
+        elif cls._executor is None:
+            cls._executor = ProcessPoolExecutor(
+                max_workers=config.render_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(tuple(initializers),),
+            )
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the worker processes; call this once before the bot shuts down."""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @classmethod
+    async def render(cls, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run the render job and return its result
+
+        Parameters
+        ------
+        func: `Callable[..., T]`
+            Module-level sync render function.
+        *args, **kwargs:
+            Picklable arguments of the render function.
+
+        Raises
+        ------
+        `Exception`:
+            The render queue is full or the job takes too long.
+        """
+        cls._foreground_jobs += 1
+        cls._get_idle_event().clear()
+        try:
+            return await cls._render(func, args, kwargs, config.render_queue_timeout)
+        finally:
+            cls._foreground_jobs -= 1
+            if cls._foreground_jobs == 0:
+                cls._get_idle_event().set()
+
+    @classmethod
+    async def render_background(cls, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a low-priority render job (e.g., rendering cards in advance) and return its result.
+
+        At most `config.render_background_jobs` background jobs run at the same time across the bot,
+        and a background job only starts when no other job is waiting or running,
+        so it never delays the images requested by users.
+        """
+        if cls._background_semaphore is None:
+            cls._background_semaphore = asyncio.Semaphore(max(1, config.render_background_jobs))
+        async with cls._background_semaphore:
+            await cls._get_idle_event().wait()
+            return await cls._render(func, args, kwargs, None)
+
+    @classmethod
+    def _get_idle_event(cls) -> asyncio.Event:
+        if cls._idle is None:
+            cls._idle = asyncio.Event()
+            if cls._foreground_jobs == 0:
+                cls._idle.set()
+        return cls._idle
+
+    @classmethod
+    async def _render(
+        cls, func: Callable[..., T], args: tuple, kwargs: dict[str, Any], queue_timeout: float | None
+    ) -> T:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(max(1, config.render_queue_size))
+        job_name = func.__name__
+
+        try:
+            await asyncio.wait_for(cls._semaphore.acquire(), queue_timeout)
+        except asyncio.TimeoutError:
+            Metrics.RENDER_REJECTED.labels(job_name).inc()
+            raise Exception("Too many images are being drawn at the moment, please try again later.")
+
+        semaphore = cls._semaphore
+
+        def on_done(future: asyncio.Future) -> None:
+            semaphore.release()
+            if not future.cancelled():
+                future.exception()  # Retrieve the error of a job that timed out, so it is not logged as unhandled
+
+        submit_time = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            job = functools.partial(_run_job, func, args, kwargs)
+            future = loop.run_in_executor(cls._executor, job)
+        except BaseException:
+            semaphore.release()
+            raise
+        # The slot is released when the job really finishes, a timed out job still occupies its worker
+        future.add_done_callback(on_done)
+        try:
+            result, start_time, elapsed = await asyncio.wait_for(asyncio.shield(future), config.render_timeout)
+        except asyncio.TimeoutError:
+            raise Exception("Drawing the image took too long, please try again later.")
+
+        Metrics.RENDER_QUEUE_WAIT_SECONDS.labels(job_name).observe(max(0.0, start_time - submit_time))
+        Metrics.RENDER_SECONDS.labels(job_name).observe(elapsed)
+        return result
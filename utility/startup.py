@@ -0,0 +1,113 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Sequence
+
+import sentry_sdk
+
+from .custom_log import LOG
+from .prometheus import Metrics
+
+
+@dataclass
+class StartupStage:
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    depends_on: Sequence[str] = ()
+    """Names of the stages that must finish successfully before this stage starts"""
+    required: bool = True
+    """When a required stage fails, `StartupPipeline.run` raises after every other stage finishes"""
+    status: str = "pending"
+    """pending, ok, failed or skipped"""
+    start: float = 0.0
+    """Seconds from the start of the pipeline to the start of the stage"""
+    elapsed: float = 0.0
+    error: BaseException | None = field(default=None, repr=False)
+
+
+class StartupPipeline:
+    """Run startup stages concurrently, each stage starts as soon as the stages it depends on are finished.
+
+    When a stage fails, the stages depending on it are skipped. After all stages are finished,
+    the time of each stage is logged and exported as `Metrics.STARTUP_STAGE_SECONDS`.
+
+    Example:
+    ```
+    pipeline = StartupPipeline("boot")
+    pipeline.add("database", Database.init)
+    pipeline.add("cogs", load_cogs, depends_on=["database"])
+    await pipeline.run()
+    ```
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stages: dict[str, StartupStage] = {}
+        self.elapsed: float = 0.0
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        *,
+        depends_on: Sequence[str] = (),
+        required: bool = True,
+    ) -> None:
+        """Add a stage, the stages it depends on must be added before it"""
+        if name in self.stages:
+            raise ValueError(f"Duplicate startup stage: {name}")
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"Unknown dependency of the startup stage {name}: {dependency}")
+        self.stages[name] = StartupStage(name, func, tuple(depends_on), required)
+
+    async def run(self) -> None:
+        """Run all stages, then log the timing report
+
+        Raises
+        ------
+        `Exception`:
+            The first error of the required stages that failed.
+        """
+        start_time = time.perf_counter()
+        tasks: dict[str, asyncio.Task[bool]] = {}
+
+        async def run_stage(stage: StartupStage) -> bool:
+            results = [await tasks[dependency] for dependency in stage.depends_on]
+            if not all(results):
+                stage.status = "skipped"
+                return False
+            stage.start = time.perf_counter() - start_time
+            try:
+                await stage.func()
+            except Exception as e:
+                stage.status, stage.error = "failed", e
+                LOG.Error(f"Startup stage {self.name}/{stage.name} failed: {e}")
+                sentry_sdk.capture_exception(e)
+            else:
+                stage.status = "ok"
+            stage.elapsed = time.perf_counter() - start_time - stage.start
+            Metrics.STARTUP_STAGE_SECONDS.labels(self.name, stage.name).set(stage.elapsed)
+            return stage.status == "ok"
+
+        # Stages are added after their dependencies, so every dependency task exists before it is awaited
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.create_task(run_stage(stage))
+        await asyncio.gather(*tasks.values())
+
+        self.elapsed = time.perf_counter() - start_time
+        Metrics.STARTUP_STAGE_SECONDS.labels(self.name, "total").set(self.elapsed)
+        LOG.System(self.report())
+
+        for stage in self.stages.values():
+            if stage.required and stage.status != "ok":
+                raise stage.error or Exception(f"Startup stage {self.name}/{stage.name} was skipped")
+
+    def report(self) -> str:
+        """Timing report of the stages, slowest first"""
+        stages = sorted(self.stages.values(), key=lambda stage: stage.elapsed, reverse=True)
+        details = ", ".join(
+            f"{stage.name} {stage.elapsed:.2f}s" + ("" if stage.status == "ok" else f" ({stage.status})")
+            for stage in stages
+        )
+        return f"Startup {self.name}: finished in {self.elapsed:.2f}s | {details}"